@@ -1,5 +1,8 @@
 from __future__ import absolute_import
 from .creader_wrapper import RecorderReader
+from .build_intervals import FileFilter, load_file_filter
 from .reporter import print_metrics
+from .sampling import print_sample_metrics
+from .compare import print_comparison
 
 __version__ = "0.5.6"
@@ -1,6 +1,13 @@
 #!/usr/bin/env python
 # encoding: utf-8
+import re, sys
+from bisect import bisect_left
 from mpi4py import MPI
+from .file_table import FileTable
+
+# I/O layers that get their own intervals and metrics, from the lowest to the highest
+LEVELS = ("posix", "mpiio", "hdf5", "pnetcdf")
+
 
 def get_mpi_datatype(type_str):
     try:
@@ -18,20 +25,241 @@ def get_mpi_type_size(type_str):
         return datatype.Get_size()
 
 
-def ignore_files(filename):
-    if not filename or filename == "":
-        return True
-    #else: return False # DEBUG
-    ignore_prefixes = ["/sys/", "/proc", "/p/lustre2/wang116/applications/ParaDis.v2.5.1.1/Copper/Copper_results/fluxdata/", "/etc/", "stdout", "stderr", "stdin"]
-    ignore_parts = [".locktest", "_cid-", "pipe:"]
-    for prefix in ignore_prefixes:
-        if filename.startswith(prefix):
-            return True
-    for part in ignore_parts:
-        if part in filename:
+def get_h5_type_size(type_str):
+    native_sizes = {
+        "H5T_NATIVE_CHAR": 1, "H5T_NATIVE_SCHAR": 1, "H5T_NATIVE_UCHAR": 1,
+        "H5T_NATIVE_SHORT": 2, "H5T_NATIVE_USHORT": 2,
+        "H5T_NATIVE_INT": 4, "H5T_NATIVE_UINT": 4, "H5T_NATIVE_FLOAT": 4,
+        "H5T_NATIVE_LONG": 8, "H5T_NATIVE_ULONG": 8, "H5T_NATIVE_LLONG": 8,
+        "H5T_NATIVE_ULLONG": 8, "H5T_NATIVE_DOUBLE": 8, "H5T_NATIVE_LDOUBLE": 16,
+        "H5T_NATIVE_HSIZE": 8, "H5T_NATIVE_HSSIZE": 8, "H5T_NATIVE_HERR": 4,
+        "H5T_NATIVE_HBOOL": 1,
+    }
+    if type_str in native_sizes:
+        return native_sizes[type_str]
+    # e.g. H5T_STD_I32LE, H5T_IEEE_F64BE, H5T_NATIVE_INT16
+    match = re.search(r"(?:_[IUFB]|INT|UINT)(\d+)(?:LE|BE)?$", type_str)
+    if match:
+        return int(match.group(1)) // 8
+    return 0
+
+
+def get_pnetcdf_type_size(type_str):
+    sizes = {
+        "text": 1, "schar": 1, "uchar": 1, "short": 2, "ushort": 2,
+        "int": 4, "uint": 4, "float": 4, "long": 8, "double": 8,
+        "longlong": 8, "ulonglong": 8,
+    }
+    return sizes.get(type_str, 0)
+
+
+def get_dims_product(arg_str):
+    # array arguments (dataspace dims, start / count vectors) are recorded as a
+    # bracketed list of integers, everything else (ids, pointers) has no size
+    if not re.match(r"\s*[\[({]", arg_str):
+        return 0
+    dims = re.findall(r"\d+", arg_str)
+    if not dims:
+        return 0
+    product = 1
+    for dim in dims:
+        product *= int(dim)
+    return product
+
+
+# H5S_ALL as recorded for the dataspace arguments of H5Dwrite / H5Dread
+H5S_ALL = ("0", "H5S_ALL")
+
+
+class Hdf5Sizes():
+    """
+    Element counts of HDF5 dataspaces and sizes of datatypes per (rank, id):
+        Recorder logs hid_t arguments as integer ids and does not record return
+        values, so ids returned by H5Screate_simple, H5Dget_space or H5Dcreate*
+        cannot be linked to the calls that use them. Only what the arguments
+        state about an id is kept: selections (H5Sselect_*) and extents
+        (H5Sset_extent_simple) of dataspaces, extents of datasets (H5Dset_extent)
+        and sizes of datatypes (H5Tset_size, predefined type names).
+    """
+    def __init__(self):
+        self.selections = {}    # (rank, space id) -> selected elements
+        self.extents = {}       # (rank, space id) -> extent elements
+        self.datasets = {}      # (rank, dataset id) -> extent elements
+        self.types = {}         # (rank, type id) -> size in bytes
+
+    def select(self, key, op, elements):
+        # H5S_SELECT_OR adds to the current selection, which has to be known
+        if op in ("H5S_SELECT_OR", "1"):
+            if key not in self.selections:
+                return
+            elements += self.selections[key]
+        self.selections[key] = elements
+
+    def update(self, rank, func, args):
+        if func.startswith("H5S"):
+            key = (rank, args[0]) if args else None
+        if func == "H5Sset_extent_simple":
+            # (space_id, rank, dims, maxdims), a new extent selects all elements
+            self.extents[key] = self.selections[key] = get_dims_product(args[2])
+        elif func == "H5Sselect_hyperslab":
+            # (space_id, op, start, stride, count, block)
+            self.select(key, args[1], get_dims_product(args[4]) * (get_dims_product(args[5]) or 1))
+        elif func == "H5Sselect_elements":
+            # (space_id, op, num_elements, coord)
+            self.select(key, args[1], int(args[2]))
+        elif func == "H5Sselect_all":
+            if key in self.extents:
+                self.selections[key] = self.extents[key]
+            else:
+                self.selections.pop(key, None)
+        elif func == "H5Sselect_none":
+            self.selections[key] = 0
+        elif func == "H5Sclose":
+            self.selections.pop(key, None)
+            self.extents.pop(key, None)
+        elif func == "H5Dset_extent":
+            # (dset_id, dims)
+            self.datasets[(rank, args[0])] = get_dims_product(args[1])
+        elif func == "H5Dclose":
+            self.datasets.pop((rank, args[0]), None)
+        elif func == "H5Tset_size":
+            # (type_id, size)
+            self.types[(rank, args[0])] = int(args[1])
+        elif func == "H5Tclose":
+            self.types.pop((rank, args[0]), None)
+
+    def get_count(self, rank, args):
+        # H5Dwrite / H5Dread(dset_id, mem_type_id, mem_space_id, file_space_id, xfer_plist_id, buf)
+        # returns None if the byte count cannot be derived from the arguments
+        type_size = get_h5_type_size(args[1]) or self.types.get((rank, args[1]))
+        if not type_size:
+            return None
+        # both selections have the same number of elements, the file space is checked first
+        for space_arg in (args[3], args[2]):
+            elements = get_dims_product(space_arg)
+            if elements:
+                return elements * type_size
+            if space_arg in H5S_ALL: continue
+            elements = self.selections.get((rank, space_arg))
+            if elements is not None:
+                return elements * type_size
+        if args[3] in H5S_ALL and args[2] in H5S_ALL:
+            # the whole dataset
+            elements = self.datasets.get((rank, args[0]))
+            if elements is not None:
+                return elements * type_size
+        return None
+
+
+def get_nested_bytes(intervals, starts, file_id, interval):
+    # bytes of the I/O that an HDF5 write / read issued on its file: the MPI-IO data calls
+    # (POSIX ones, if there are none) of the same kind on the same rank within its time span.
+    # starts caches the sorted start times per (level, file id)
+    rank, tstart, tend, operation = interval[:4]
+    for level in ("mpiio", "posix"):
+        file_intervals = intervals[level].get(file_id)
+        if not file_intervals: continue
+        if (level, file_id) not in starts:
+            starts[(level, file_id)] = [x[1] for x in file_intervals]
+        nested = None
+        for i in range(bisect_left(starts[(level, file_id)], tstart), len(file_intervals)):
+            x = file_intervals[i]
+            if x[1] > tend: break
+            if x[0] == rank and x[3] == operation and x[2] <= tend:
+                nested = (nested or 0) + x[4]
+        if nested is not None:
+            return nested
+    return None
+
+
+DEFAULT_IGNORE_PREFIXES = ["/sys/", "/proc", "/etc/", "stdout", "stderr", "stdin"]
+DEFAULT_IGNORE_PARTS = [".locktest", "_cid-", "pipe:"]
+
+
+class FileFilter():
+    """
+    Decides which files are ignored:
+        prefix and substring rules are compiled into a single regex, regex rules
+        are compiled one by one (so that their flags and group numbers stay their own),
+        the verdict is memoized per (interned) filename, so every distinct
+        file is matched once and every record costs one dict lookup.
+    """
+    def __init__(self, prefixes=None, parts=None, patterns=None):
+        self.prefixes = list(DEFAULT_IGNORE_PREFIXES if prefixes is None else prefixes)
+        self.parts = list(DEFAULT_IGNORE_PARTS if parts is None else parts)
+        self.patterns = list(patterns or [])
+        self.verdicts = {}
+
+        rules = []
+        if self.prefixes:
+            rules.append("^(?:" + "|".join(re.escape(x) for x in self.prefixes) + ")")
+        if self.parts:
+            rules.append("(?:" + "|".join(re.escape(x) for x in self.parts) + ")")
+        self.regex = re.compile("|".join(rules)) if rules else None
+        self.regexes = [re.compile(x) for x in self.patterns]
+
+    def match(self, filename):
+        if self.regex is not None and self.regex.search(filename) is not None:
             return True
+        return any(x.search(filename) is not None for x in self.regexes)
+
+    def ignore(self, filename):
+        verdict = self.verdicts.get(filename)
+        if verdict is None:
+            verdict = not filename or self.match(filename)
+            self.verdicts[sys.intern(filename)] = verdict
+        return verdict
+
+
+def load_file_filter(path=None, prefixes=(), parts=(), defaults=True):
+    """
+    Builds a FileFilter from the default rules, a rules file and extra rules.
+    The rules file has one rule per line, the kind and its value are separated
+    by whitespace, lines starting with "#" are comments ("#" may appear in rules):
+        prefix /scratch/tmp/
+        contains .lock
+        regex \\.o[0-9]+$
+    """
+    rules = {
+        "prefix": list(DEFAULT_IGNORE_PREFIXES) if defaults else [],
+        "contains": list(DEFAULT_IGNORE_PARTS) if defaults else [],
+        "regex": []
+    }
+    if path is not None:
+        with open(path, "r") as f:
+            for num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"): continue
+                fields = line.split(None, 1)
+                if len(fields) != 2 or fields[0] not in rules:
+                    raise ValueError(f"{path}:{num}: invalid ignore rule '{line}'")
+                if fields[0] == "regex":
+                    try:
+                        re.compile(fields[1])
+                    except re.error as e:
+                        raise ValueError(f"{path}:{num}: invalid regex '{fields[1]}': {e}")
+                rules[fields[0]].append(fields[1])
+    rules["prefix"] += prefixes
+    rules["contains"] += parts
+    return FileFilter(rules["prefix"], rules["contains"], rules["regex"])
 
-    return False
+
+DEFAULT_FILE_FILTER = FileFilter()
+
+
+def ignore_files(filename):
+    return DEFAULT_FILE_FILTER.ignore(filename)
+
+
+# a bare fd or FILE* pointer that was not translated into a path by Recorder
+HANDLE_REGEX = re.compile(r"\d+|0x[0-9a-fA-F]+")
+# POSIX calls with an operation whose first argument is a fd or FILE*,
+# only these can carry a bare handle, all other calls record a path
+POSIX_HANDLE_FUNCS = frozenset([
+    "write", "read", "pwrite", "pread", "pwrite64", "pread64",
+    "close", "fclose", "lseek", "lseek64", "fseek", "fseeko",
+    "fsync", "fdatasync", "sync_file_range", "ftruncate", "ftruncate64",
+])
 
 
 def ignore_funcs(func):
@@ -39,27 +267,141 @@ def ignore_funcs(func):
     for f in ignore:
         if f in func:
             return True
+    # (P)NetCDF calls are matched as prefixes, e.g. sync_file_range is a POSIX call
+    if func.startswith("ncmpi") or func.startswith("nc_"):
+        return True
     return False
 
 
-# only return record data of write / read calls by MPI / HDF5
-def build_intervals(reader, posix: bool):
+def get_level(func):
+    if func.startswith("MPI_File"):
+        return "mpiio"
+    if func.startswith("H5"):
+        return "hdf5"
+    if func.startswith("ncmpi"):
+        return "pnetcdf"
+    if not ignore_funcs(func):
+        return "posix"
+    return None
+
+
+def get_posix_operation(func, args):
 
     def ignore_operations(func):
-        ops = ["fwrite", "fread", "writev", "readv", "fprintf"]
+        # readdir / readlink only match the name, they do not access file data
+        ops = ["fwrite", "fread", "writev", "readv", "fprintf", "readdir", "readlink"]
         for f in ops:
             if f in func:
                 return True
         return False
 
+    # TODO: other write / read calls have count at different index in args
+    if ("write" in func or "pwrite" in func) and not ignore_operations(func):
+        return "write", int(args[2])
+    elif ("read" in func or "pread" in func) and not ignore_operations(func):
+        return "read", int(args[2])
+    elif "open" in func:
+        return "open", 0
+    elif "close" in func:
+        return "close", 0
+    elif "seek" in func:
+        return "seek", 0
+    elif "sync" in func:
+        return "sync", 0
+    elif "ftruncate" in func:
+        return "ftruncate", 0
+    #elif "fcntl" in func:
+    #    return "fcntl", 0
+    return None, 0
+
+
+def get_mpiio_operation(func, args):
+    if "write" in func or "read" in func:
+        if "at" in func:
+            count = int(args[3]) * get_mpi_type_size(args[4])
+        else:
+            count = int(args[2]) * get_mpi_type_size(args[3])
+        return ("write" if "write" in func else "read"), count
+    elif "open" in func:
+        return "open", 0
+    elif "close" in func:
+        return "close", 0
+    elif "set_size" in func:
+        return "set_size", 0
+    return None, 0
+
+
+def get_hdf5_operation(func, args):
+    # the byte count of H5Dwrite / H5Dread depends on earlier dataspace
+    # and datatype calls of the rank and is resolved by Hdf5Sizes
+    if func in ("H5Dwrite", "H5Dread"):
+        return ("write" if func == "H5Dwrite" else "read"), 0
+    elif func in ("H5Fopen", "H5Fcreate"):
+        return "open", 0
+    elif func == "H5Fclose":
+        return "close", 0
+    elif func == "H5Fflush":
+        return "sync", 0
+    return None, 0
+
+
+def get_pnetcdf_operation(func, args):
+    # only the blocking put / get calls are data operations. The nonblocking
+    # ncmpi_iput_* / ncmpi_bput_* calls only post a request, the I/O happens in
+    # ncmpi_wait(_all) for all pending requests at once and cannot be attributed
+    # to single requests, so they are not counted.
+    if func.startswith("ncmpi_put_") or func.startswith("ncmpi_get_"):
+        operation = "write" if func.startswith("ncmpi_put_") else "read"
+        # e.g. ncmpi_put_vara_double_all -> ["vara", "double"]
+        parts = func[len("ncmpi_put_"):].removesuffix("_all").split("_", 1)
+        kind = parts[0]
+        # attributes (ncmpi_put_att_*, ncmpi_get_att_*) are header metadata, not data
+        if kind == "att":
+            return None, 0
+        if len(parts) == 1:
+            # flexible API, the last two arguments are bufcount and buftype
+            return operation, int(args[-2]) * get_mpi_type_size(args[-1])
+        type_size = get_pnetcdf_type_size(parts[1])
+        if kind == "var1":
+            return operation, type_size
+        elif kind in ("vara", "vars", "varm"):
+            # (ncid, varid, start, count, ...)
+            return operation, get_dims_product(args[3]) * type_size
+        # whole variable and varn accesses do not record their size
+        return operation, 0
+    elif func in ("ncmpi_open", "ncmpi_create"):
+        return "open", 0
+    elif func == "ncmpi_close":
+        return "close", 0
+    elif func == "ncmpi_sync":
+        return "sync", 0
+    return None, 0
+
+
+# only return record data of write / read and metadata calls, per I/O level
+# intervals[level][file id], the FileTable translates the file ids to filenames
+# ranks: only read the records of these ranks, all ranks if None
+# file_filter: FileFilter deciding which files are ignored, the default rules if None
+def build_intervals(reader, ranks=None, file_filter=None):
+
+    get_operation = {
+        "posix": get_posix_operation,
+        "mpiio": get_mpiio_operation,
+        "hdf5": get_hdf5_operation,
+        "pnetcdf": get_pnetcdf_operation,
+    }
+
+    ignore_file = (file_filter or DEFAULT_FILE_FILTER).ignore
     func_list = reader.funcs
-    ranks = reader.GM.total_ranks
-    intervals = {}
+    total_ranks = reader.GM.total_ranks
+    if ranks is None:
+        ranks = range(total_ranks)
+    intervals = {level: {} for level in LEVELS}
 
     # merge the list(reader.records) of list(each rank's records) into one flat list
     # then sort the whole list by tstart
     records = []
-    for rank in range(ranks):
+    for rank in ranks:
         for i in range(reader.LMs[rank].total_records):
             record = reader.records[rank][i]
             record.rank = rank
@@ -68,84 +410,123 @@ def build_intervals(reader, posix: bool):
             if record.func_id >= len(func_list): continue
             func = func_list[record.func_id]
 
-            if posix:
-                if not ignore_funcs(func):
-                    records.append(record)
-            else:
-                if "MPI" in func:
-                    records.append(record)
+            record.level = get_level(func)
+            if record.level is not None:
+                records.append(record)
 
     records = sorted(records, key=lambda x: x.tstart)
 
-    # MPI uses shortened file handles to refer to the actual files
-    # each key corresponds to the actual filename that is used by all other records
-    mpi_file_handles = {}
+    # MPI and PnetCDF use shortened file handles to refer to the actual files,
+    # they are resolved per rank between open and close by the file table
+    files = FileTable()
+    # HDF5 file and dataset ids are not recorded with the open call, so HDF5 calls
+    # get attributed to the last file the rank opened and has not closed yet
+    hdf5_open_files = [[] for _ in range(total_ranks)]
+    hdf5_sizes = Hdf5Sizes()
+    # HDF5 writes / reads whose arguments do not give their size, sized after all records are read
+    hdf5_unsized = []
+    # POSIX calls record the path, open / close keep track of the files a rank has open
+    # to resolve the rare fd / FILE* that was not translated, if this is unambiguous
+    posix_open_files = [[] for _ in range(total_ranks)]
+    unresolved = 0
 
     for record in records:
 
         rank = record.rank
+        level = record.level
         func = func_list[record.func_id]
         args = record.args_to_strs()
-        filename = ""
+        file_id = None
+        session = 0
 
-        if posix:
-            filename = args[0]
-        else:
+        if level == "hdf5":
+            hdf5_sizes.update(rank, func, args)
+
+        # classify first, records without a data or metadata operation
+        # (e.g. H5Pcreate, MPI_File_delete) do not need a file
+        operation, count = get_operation[level](func, args)
+        if operation is None: continue
+
+        if level == "posix":
+            path = args[0]
+            # numeric paths (e.g. "0001") are only taken as a handle if the call takes one
+            # and no file of that name is open on the rank
+            if func in POSIX_HANDLE_FUNCS and HANDLE_REGEX.fullmatch(path) \
+                    and files.ids.get(path) not in posix_open_files[rank]:
+                if len(posix_open_files[rank]) == 1:
+                    file_id = posix_open_files[rank][0]
+            else:
+                file_id = files.get_id(path)
+                if operation == "open":
+                    posix_open_files[rank].append(file_id)
+                elif operation == "close" and file_id in posix_open_files[rank]:
+                    posix_open_files[rank].remove(file_id)
+        elif level == "mpiio":
             if func == "MPI_File_open":
-                filename = args[1]
-                mpi_file_handles[args[4]] = filename
+                file_id = files.open_handle(rank, args[4], args[1])
+                session = files.session(rank, args[4])
+            elif func == "MPI_File_close":
+                session = files.session(rank, args[0])
+                file_id = files.close_handle(rank, args[0])
             else:
-                filename = mpi_file_handles[args[0]]
-
-        if ignore_files(filename): continue
-
-        operation = ""
-        count = 0
-
-        if posix:
-            # TODO: other write / read calls have count at different index in args
-            if ("write" in func or "pwrite" in func) and not ignore_operations(func):
-                count = int(args[2])
-                operation = "write"
-            elif ("read" in func or "pread" in func) and not ignore_operations(func):
-                count = int(args[2])
-                operation = "read"
-            elif "open" in func:
-                operation = "open"
-            elif "close" in func:
-                operation = "close"
-            elif "seek" in func:
-                operation = "seek"
-            elif "sync" in func:
-                operation = "sync"
-            elif "ftruncate" in func:
-                operation = "ftruncate"
-            #elif "fcntl" in func:
-            #    operation = "fcntl"
-            else: continue
+                file_id = files.resolve(rank, args[0])
+                session = files.session(rank, args[0])
+        elif level == "pnetcdf":
+            if func in ("ncmpi_open", "ncmpi_create"):
+                file_id = files.open_handle(rank, args[4], args[1])
+                session = files.session(rank, args[4])
+            elif func == "ncmpi_close":
+                session = files.session(rank, args[0])
+                file_id = files.close_handle(rank, args[0])
+            elif args:
+                file_id = files.resolve(rank, args[0])
+                session = files.session(rank, args[0])
         else:
-            if "write" in func:
-                if "at" in func:
-                    count = int(args[3]) * get_mpi_type_size(args[4])
-                else:
-                    count = int(args[2]) * get_mpi_type_size(args[3])
-                operation = "write"
-            elif "read" in func:
-                if "at" in func:
-                    count = int(args[3]) * get_mpi_type_size(args[4])
-                else:
-                    count = int(args[2]) * get_mpi_type_size(args[3])
-                operation = "read"
-            elif "open" in func:
-                operation = "open"
-            elif "close" in func:
-                operation = "close"
-            elif "set_size" in func:
-                operation = "set_size"
-            else: continue
-
-        if filename not in intervals:
-            intervals[filename] = []
-        # func currently only for debug purposes
-        intervals[filename].append([rank, record.tstart, record.tend, operation, count, func])
-    return intervals
\ No newline at end of file
+            if func in ("H5Fopen", "H5Fcreate"):
+                file_id = files.get_id(args[0])
+                hdf5_open_files[rank].append(file_id)
+            elif hdf5_open_files[rank]:
+                file_id = hdf5_open_files[rank][-1]
+                if func == "H5Fclose":
+                    hdf5_open_files[rank].pop()
+
+        if file_id is None:
+            unresolved += 1
+            continue
+        if ignore_file(files.names[file_id]): continue
+
+        if level == "hdf5" and operation in ("write", "read"):
+            count = hdf5_sizes.get_count(rank, args)
+
+        level_intervals = intervals[level]
+        if file_id not in level_intervals:
+            level_intervals[file_id] = []
+        # func currently only for debug purposes, session is the open session of the
+        # MPI-IO / PnetCDF handle on its rank (always 0 for POSIX and HDF5)
+        interval = [rank, record.tstart, record.tend, operation, count, func, session]
+        level_intervals[file_id].append(interval)
+        if count is None:
+            hdf5_unsized.append((file_id, interval))
+
+    # e.g. native types passed as ids or whole dataset accesses (H5S_ALL) are
+    # sized with the lower level I/O they issued
+    starts = {}
+    skipped = set()
+    for file_id, interval in hdf5_unsized:
+        interval[4] = get_nested_bytes(intervals, starts, file_id, interval)
+        if interval[4] is None:
+            skipped.add(file_id)
+    for file_id in skipped:
+        # time without bytes would only distort the bandwidths
+        kept = [x for x in intervals["hdf5"][file_id] if x[4] is not None]
+        if kept:
+            intervals["hdf5"][file_id] = kept
+        else:
+            del intervals["hdf5"][file_id]
+    hdf5_unsized = sum(1 for _, x in hdf5_unsized if x[4] is None)
+
+    if hdf5_unsized:
+        print(f"[recorder-pm]: Warning: skipped {hdf5_unsized} HDF5 write / read calls whose byte count could not be derived from their arguments or nested I/O calls")
+    if unresolved:
+        print(f"[recorder-pm]: Skipped {unresolved} records with a file handle that is not open on their rank")
+    return intervals, files
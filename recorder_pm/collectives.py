@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# encoding: utf-8
+from .metrics import MetricObject
+
+
+def is_collective(func):
+    # e.g. MPI_File_write_all, MPI_File_read_at_all, MPI_File_write_ordered
+    return func.startswith("MPI_File") and (func.endswith("_all") or func.endswith("_ordered"))
+
+
+def match_collectives(file_intervals):
+    # every rank has to call the collective operations of a file handle in the same order,
+    # so the n-th collective call of each rank in the same open session belongs to the
+    # same instance. This assumes that all ranks using a path opened it with the same
+    # communicator, ranks of disjoint communicators opening the same path would be matched.
+    # Each instance only keeps running values, which keeps the matching linear
+    # in the number of intervals: [operation, ranks, min start, max start, max end, sum of starts, bytes]
+    call_seq = {}
+    instances = {}
+
+    for interval in file_intervals:
+        rank, tstart, tend, operation, count, func, session = interval
+        if operation not in ("write", "read") or not is_collective(func): continue
+
+        seq = call_seq.get((rank, session), 0)
+        call_seq[(rank, session)] = seq + 1
+
+        instance = instances.get((session, seq))
+        if instance is None:
+            instances[(session, seq)] = [operation, 1, tstart, tstart, tend, tstart, count]
+        else:
+            instance[1] += 1
+            instance[2] = min(instance[2], tstart)
+            instance[3] = max(instance[3], tstart)
+            instance[4] = max(instance[4], tend)
+            instance[5] += tstart
+            instance[6] += count
+
+    return instances.values()
+
+
+def collective_metrics(intervals, metricObj: MetricObject, file_table):
+    for file_id in intervals:
+        filename = file_table.name(file_id)
+        file_coll = {
+            "write": {"ops": 0, "span": 0.0, "wait": 0.0, "skew": 0.0, "bytes": 0},
+            "read": {"ops": 0, "span": 0.0, "wait": 0.0, "skew": 0.0, "bytes": 0}
+        }
+
+        for operation, ranks, min_start, max_start, max_end, sum_starts, count in match_collectives(intervals[file_id]):
+            coll = file_coll[operation]
+            coll["ops"] += 1
+            # span: first rank entering until last rank leaving the collective
+            coll["span"] += max_end - min_start
+            # skew: how much later the last rank entered than the first one
+            coll["skew"] = max(coll["skew"], max_start - min_start)
+            # wait: time every rank spent waiting for the last rank to enter, summed over ranks
+            coll["wait"] += ranks * max_start - sum_starts
+            coll["bytes"] += count
+
+        for op in ("write", "read"):
+            coll = file_coll[op]
+            if coll["ops"] == 0: continue
+            if filename not in metricObj.metrics: metricObj.add_filename(filename)
+
+            file_metrics = metricObj.metrics[filename][op]
+            file_metrics["mpiio_coll_ops"] = coll["ops"]
+            file_metrics["mpiio_coll_time"] = coll["span"]
+            file_metrics["mpiio_coll_wait_time"] = coll["wait"]
+            file_metrics["mpiio_coll_skew"] = coll["skew"]
+            # bandwidth has MiB/s as unit
+            if coll["span"] != 0:
+                file_metrics["mpiio_coll_bw"] = coll["bytes"] / coll["span"] / (1024*1024)
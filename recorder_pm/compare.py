@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# encoding: utf-8
+import json, math, os, re
+from .creader_wrapper import RecorderReader
+from .build_intervals import build_intervals, LEVELS
+from .metrics import MetricObject, load_metrics
+from .reporter import compute_metrics, get_report_files
+
+# per rank samples needed in both runs before a difference is tested
+MIN_SAMPLES = 4
+
+
+def get_metrics(path, file_filter=None):
+    # path is either a cached metric result (json) or a trace directory
+    if os.path.isfile(path):
+        return load_metrics(path)
+    reader = RecorderReader(path)
+    ranks = reader.GM.total_ranks
+    intervals, file_table = build_intervals(reader, file_filter=file_filter)
+    metrics, _ = compute_metrics(reader, intervals, ranks, file_table)
+    return metrics, ranks
+
+
+def normalize_filename(filename, rank_pattern):
+    # e.g. /out/rank_0012.dat -> /out/rank_*.dat, only the basename is normalized
+    directory, basename = os.path.split(filename)
+    return os.path.join(directory, re.sub(rank_pattern, "*", basename))
+
+
+def group_files(metricObj: MetricObject, rank_pattern=None):
+    # file level values of the comparison, files that normalize to the same name
+    # are merged: bytes add up, times are the max, per rank times add up
+    files = {}
+    for filename in get_report_files(metricObj):
+        key = normalize_filename(filename, rank_pattern) if rank_pattern else filename
+        if key not in files:
+            files[key] = {op: {"bytes": 0, "op_time": 0.0, "e2e_time": 0.0, "rank_times": {}} for op in ("write", "read")}
+
+        for op in ("write", "read"):
+            file_metrics = metricObj.metrics[filename][op]
+            values = files[key][op]
+            values["bytes"] += file_metrics["bytes"]
+            values["op_time"] = max([values["op_time"]] + [file_metrics[level + "_op_time"] for level in LEVELS])
+            values["e2e_time"] = max([values["e2e_time"]] + [file_metrics[level + "_meta_time"] for level in LEVELS])
+            for rank, t in metricObj.rank_times.get(filename, {}).get(op, {}).items():
+                values["rank_times"][rank] = values["rank_times"].get(rank, 0.0) + t
+
+    for key in files:
+        for op in ("write", "read"):
+            values = files[key][op]
+            values["bandwidth"] = values["bytes"] / values["e2e_time"] / (1024*1024) if values["e2e_time"] != 0 else 0.0
+    return files
+
+
+def get_overall_rank_times(files, op):
+    # e2e time of every rank summed over all files
+    rank_times = {}
+    for values in files.values():
+        for rank, t in values[op]["rank_times"].items():
+            rank_times[rank] = rank_times.get(rank, 0.0) + t
+    return list(rank_times.values())
+
+
+def mann_whitney_greater(base, new):
+    # one-sided Mann-Whitney U test with normal approximation and tie correction,
+    # p-value for the new values being stochastically greater than the base values
+    n1, n2 = len(base), len(new)
+    if n1 < MIN_SAMPLES or n2 < MIN_SAMPLES:
+        return None
+
+    values = sorted([(x, 0) for x in base] + [(x, 1) for x in new])
+    n = n1 + n2
+    rank_sum_new = 0.0
+    tie_sum = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        # tied values get the average of their ranks (1-based)
+        avg_rank = (i + j) / 2 + 1
+        rank_sum_new += avg_rank * sum(1 for k in range(i, j + 1) if values[k][1] == 1)
+        ties = j - i + 1
+        tie_sum += ties ** 3 - ties
+        i = j + 1
+
+    u_new = rank_sum_new - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_new - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def get_delta(base, new):
+    return {
+        "base": base,
+        "new": new,
+        "delta": new - base,
+        "ratio": new / base if base != 0 else None
+    }
+
+
+def is_regression(e2e_time, p_value, threshold, alpha):
+    ratio = e2e_time["ratio"]
+    return ratio is not None and ratio > 1 + threshold and p_value is not None and p_value < alpha
+
+
+def compare_metrics(base, new, rank_pattern=None, threshold=0.1, alpha=0.05):
+    """
+    Compares two metric results, new against base:
+        deltas and ratios of the overall metrics and of
+        bytes, op time, e2e time and bandwidth per file.
+        A regression is an e2e time increase by more than threshold
+        that is significant (p < alpha) on the per rank e2e times.
+        With fewer than MIN_SAMPLES ranks in one of the runs there is no test,
+        "tested" is false and p_value is None.
+    """
+    result = {"threshold": threshold, "alpha": alpha, "overall": {}, "files": {}, "regressions": []}
+    base_files = group_files(base, rank_pattern)
+    new_files = group_files(new, rank_pattern)
+
+    for op in ("write", "read"):
+        base_overall = base.metrics["overall"][op]
+        new_overall = new.metrics["overall"][op]
+        overall = {x: get_delta(base_overall[x], new_overall[x]) for x in base_overall if x in new_overall}
+
+        base_times = get_overall_rank_times(base_files, op)
+        new_times = get_overall_rank_times(new_files, op)
+        # overall e2e time: the max over ranks of the per rank e2e time summed over all files
+        e2e_time = get_delta(max(base_times, default=0.0), max(new_times, default=0.0))
+        p_value = mann_whitney_greater(base_times, new_times)
+        overall["e2e_time"] = e2e_time
+        overall["tested"] = p_value is not None
+        overall["p_value"] = p_value
+        overall["regression"] = is_regression(e2e_time, p_value, threshold, alpha)
+        result["overall"][op] = overall
+        if overall["regression"]:
+            result["regressions"].append({"file": "overall", "op": op, "e2e_time_ratio": e2e_time["ratio"], "p_value": p_value})
+
+    for key in sorted(set(base_files) & set(new_files)):
+        result["files"][key] = {}
+        for op in ("write", "read"):
+            base_values = base_files[key][op]
+            new_values = new_files[key][op]
+            file_result = {x: get_delta(base_values[x], new_values[x]) for x in ("bytes", "op_time", "e2e_time", "bandwidth")}
+            p_value = mann_whitney_greater(list(base_values["rank_times"].values()), list(new_values["rank_times"].values()))
+            file_result["tested"] = p_value is not None
+            file_result["p_value"] = p_value
+            file_result["regression"] = is_regression(file_result["e2e_time"], p_value, threshold, alpha)
+            result["files"][key][op] = file_result
+            if file_result["regression"]:
+                result["regressions"].append({"file": key, "op": op, "e2e_time_ratio": file_result["e2e_time"]["ratio"], "p_value": p_value})
+
+    result["only_in_base"] = sorted(set(base_files) - set(new_files))
+    result["only_in_new"] = sorted(set(new_files) - set(base_files))
+    return result
+
+
+def print_comparison(base_path, new_path, output_path, rank_pattern=None, threshold=0.1, alpha=0.05, file_filter=None):
+    base, _ = get_metrics(base_path, file_filter)
+    new, _ = get_metrics(new_path, file_filter)
+    result = compare_metrics(base, new, rank_pattern, threshold, alpha)
+    result["base"] = base_path
+    result["new"] = new_path
+
+    with open(output_path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[recorder-pm]: {len(result['regressions'])} regression(s) found")
+    return result
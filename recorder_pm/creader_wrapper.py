@@ -37,15 +37,18 @@ Per-rank metadata:
 
     This is a recorder-viz only class
     not used in C reader code.
+
+    With scan=False only the number of records is kept,
+    which avoids a pass over all records of the rank.
 """
 class LocalMetadata():
-    def __init__(self, func_list, records, total_records):
+    def __init__(self, func_list, records, total_records, scan=True):
         self.total_records = total_records
         self.num_files =0
         self.filemap = set()
         self.function_count = [0] * len(func_list)
 
-        for idx in range(total_records):
+        for idx in range(total_records if scan else 0):
             r = records[idx]
 
             # Ignore user functions for now
@@ -99,7 +102,7 @@ class RecorderReader:
     def str2char_p(self, s):
         return c_char_p( s.encode('utf-8') )
 
-    def __init__(self, logs_dir):
+    def __init__(self, logs_dir, local_metadata=True):
         if "RECORDER_INSTALL_PATH" not in os.environ:
             msg="Error:\n"\
                 "    RECORDER_INSTALL_PATH environment variable is not set.\n" \
@@ -132,9 +135,9 @@ class RecorderReader:
 
         self.LMs = []
         for rank in range(self.GM.total_ranks):
-            LM = LocalMetadata(self.funcs, self.records[rank], counts[rank])
+            LM = LocalMetadata(self.funcs, self.records[rank], counts[rank], local_metadata)
             self.LMs.append(LM)
-            print("Rank: %d, intercepted calls: %d, accessed files: %d" %(rank, counts[rank], LM.num_files))
+            if local_metadata: print("Rank: %d, intercepted calls: %d, accessed files: %d" %(rank, counts[rank], LM.num_files))
 
     def load_func_list(self, global_metadata_path):
         nprocs = 0
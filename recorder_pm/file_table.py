@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# encoding: utf-8
+import sys
+
+
+class FileTable():
+    """
+    Interned string table built while reading the records:
+        every filename gets an integer file id, intervals and metrics
+        are grouped by these ids and only translated back for the report.
+        File handles (MPI-IO fh, PnetCDF ncid) are resolved per (rank, handle)
+        and only between their open and close, so a handle value that
+        is reused by another rank or after a close cannot resolve to the wrong file.
+        Every open of a handle starts a new session, numbered per (rank, file),
+        so the n-th open of a file on each rank is session n on all ranks.
+    """
+    def __init__(self):
+        self.ids = {}       # filename -> file id
+        self.names = []     # file id -> filename
+        self.handles = {}   # (rank, handle) -> file id of the open file
+        self.sessions = {}  # (rank, handle) -> open session of the handle
+        self.opens = {}     # (rank, file id) -> number of opens so far
+
+    def get_id(self, filename):
+        file_id = self.ids.get(filename)
+        if file_id is None:
+            file_id = len(self.names)
+            filename = sys.intern(filename)
+            self.ids[filename] = file_id
+            self.names.append(filename)
+        return file_id
+
+    def name(self, file_id):
+        return self.names[file_id]
+
+    def open_handle(self, rank, handle, filename):
+        file_id = self.get_id(filename)
+        session = self.opens.get((rank, file_id), 0)
+        self.opens[(rank, file_id)] = session + 1
+        self.handles[(rank, handle)] = file_id
+        self.sessions[(rank, handle)] = session
+        return file_id
+
+    def resolve(self, rank, handle):
+        # None if the handle is not open on this rank
+        return self.handles.get((rank, handle))
+
+    def session(self, rank, handle):
+        # 0 if the handle is not open on this rank
+        return self.sessions.get((rank, handle), 0)
+
+    def close_handle(self, rank, handle):
+        self.sessions.pop((rank, handle), None)
+        return self.handles.pop((rank, handle), None)
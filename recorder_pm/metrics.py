@@ -1,73 +1,72 @@
 from ctypes import *
-import os, glob, struct
+import os, glob, struct, json
 from .creader_wrapper import RecorderReader
-from recorder_pm.build_intervals import ignore_files
+from recorder_pm.build_intervals import ignore_files, LEVELS
 
 class MetricObject(RecorderReader):
     def __init__(self, reader):
         # TODO: maybe add open / close time seperately
         # metrics has this structure: metrics[filename][write/read][metric]
         # the structure for each metrics[filename] can be seen in add_filename
-        self.metrics = {
-            "overall": {
-                "write": {
-                    "total_bytes": 0,               
-                    "max_posix_op_time": 0.0,       # max of file posix_op_time (-> max op time of all ranks and files)
-                    "max_posix_meta_time": 0.0,     # analogous to the above
-                    "agg_posix_pure_bw": 0.0,       # posix_pure_bw aggregated over all files (total_bytes / max_posix_op_time)
-                    "agg_posix_e2e_bw": 0.0,        # analogous to the above
-                    "avg_posix_pure_bw": 0.0,       # posix_pure_bw over all files as the average over all file posix_pure_bw
-                    "avg_posix_e2e_bw": 0.0,        # analogous to the above
-                    "max_mpiio_op_time": 0.0,       # rest analogous to the above posix metrics
-                    "max_mpiio_meta_time": 0.0,
-                    "agg_mpiio_pure_bw": 0.0,
-                    "agg_mpiio_e2e_bw": 0.0,
-                    "avg_mpiio_pure_bw": 0.0,
-                    "avg_mpiio_e2e_bw": 0.0
-                },
-                "read": {                           # analogous to write metrics
-                    "total_bytes": 0,
-                    "max_posix_op_time": 0.0,
-                    "max_posix_meta_time": 0.0,
-                    "agg_posix_pure_bw": 0.0,
-                    "agg_posix_e2e_bw": 0.0,
-                    "avg_posix_pure_bw": 0.0,
-                    "avg_posix_e2e_bw": 0.0,
-                    "max_mpiio_op_time": 0.0,
-                    "max_mpiio_meta_time": 0.0,
-                    "agg_mpiio_pure_bw": 0.0,
-                    "agg_mpiio_e2e_bw": 0.0,
-                    "avg_mpiio_pure_bw": 0.0,
-                    "avg_mpiio_e2e_bw": 0.0
-                },
-            }
-        }
+        # every level in LEVELS (posix, mpiio, hdf5, pnetcdf) gets the same set of metrics
+        self.metrics = {"overall": {"write": {}, "read": {}}}
+        for op in ("write", "read"):
+            overall = self.metrics["overall"][op]
+            overall["total_bytes"] = 0
+            for level in LEVELS:
+                overall["max_" + level + "_op_time"] = 0.0     # max of file <level>_op_time (-> max op time of all ranks and files)
+                overall["max_" + level + "_meta_time"] = 0.0   # analogous to the above
+                overall["agg_" + level + "_pure_bw"] = 0.0     # <level>_pure_bw aggregated over all files (total_bytes / max_<level>_op_time)
+                overall["agg_" + level + "_e2e_bw"] = 0.0      # analogous to the above
+                overall["avg_" + level + "_pure_bw"] = 0.0     # <level>_pure_bw over all files as the average over all file <level>_pure_bw
+                overall["avg_" + level + "_e2e_bw"] = 0.0      # analogous to the above
+            overall["total_mpiio_coll_ops"] = 0                # sum of mpiio_coll_ops over all files
+            overall["total_mpiio_coll_wait_time"] = 0.0        # sum of mpiio_coll_wait_time over all files
+            overall["max_mpiio_coll_skew"] = 0.0               # max of file mpiio_coll_skew
+
+        # rank_times has this structure: rank_times[filename][write/read][rank] = e2e time
+        # only ranks with a non-zero e2e time are kept, the e2e time is the max over all levels
+        self.rank_times = {}
 
         # TODO: add IOPS if there is enough time
 
     def add_filename(self, filename):
-        self.metrics[filename] = {
-            "write": {
-                "bytes": 0,              # total bytes written per file
-                "posix_op_time": 0.0,    # posix write time per file (max of all rank times) 
-                "posix_meta_time": 0.0,  # posix meta + write time per file (max of all rank times)
-                "posix_pure_bw": 0.0,    # bandwidth per file that only contains posix write times
-                "posix_e2e_bw": 0.0,     # bandwidth per file that only contains posix meta / write times
-                "mpiio_op_time": 0.0,    # mpiio write time per file (max of all rank times) 
-                "mpiio_meta_time": 0.0,  # mpiio meta + write time per file (max of all rank times)   
-                "mpiio_pure_bw": 0.0,    # mpiio write time per file (max of all rank times)     
-                "mpiio_e2e_bw": 0.0      # mpiio meta + write time per file (max of all rank times)
-            },
-            "read": {                   # analogous to write metrics
-                "bytes": 0,
-                "posix_op_time": 0.0,
-                "posix_meta_time": 0.0,
-                "posix_pure_bw": 0.0,
-                "posix_e2e_bw": 0.0,
-                "mpiio_op_time": 0.0,
-                "mpiio_meta_time": 0.0,
-                "mpiio_pure_bw": 0.0,
-                "mpiio_e2e_bw": 0.0
-            }
-        }
+        self.metrics[filename] = {"write": {}, "read": {}}
+        for op in ("write", "read"):
+            file_metrics = self.metrics[filename][op]
+            file_metrics["bytes"] = 0                       # total bytes written / read per file
+            for level in LEVELS:
+                file_metrics[level + "_op_time"] = 0.0      # write / read time per file on this level (max of all rank times)
+                file_metrics[level + "_meta_time"] = 0.0    # meta + write / read time per file on this level (max of all rank times)
+                file_metrics[level + "_pure_bw"] = 0.0      # bandwidth per file that only contains write / read times
+                file_metrics[level + "_e2e_bw"] = 0.0       # bandwidth per file that contains meta / write / read times
+            # collective MPI-IO calls matched across ranks, one instance per collective call
+            file_metrics["mpiio_coll_ops"] = 0              # number of collective instances
+            file_metrics["mpiio_coll_time"] = 0.0           # sum of instance spans (first rank start to last rank end)
+            file_metrics["mpiio_coll_wait_time"] = 0.0      # time ranks waited for the last rank to enter, summed over ranks and instances
+            file_metrics["mpiio_coll_skew"] = 0.0           # max difference between first and last rank entering an instance
+            file_metrics["mpiio_coll_bw"] = 0.0             # collective bytes / mpiio_coll_time
+
+    def add_rank_times(self, filename):
+        if filename not in self.rank_times:
+            self.rank_times[filename] = {"write": {}, "read": {}}
+        return self.rank_times[filename]
 
+
+# cached metric results, e.g. for comparing runs without reading the traces again
+def save_metrics(metricObj: MetricObject, ranks, path):
+    with open(path, "w") as f:
+        json.dump({"ranks": ranks, "metrics": metricObj.metrics, "rank_times": metricObj.rank_times}, f)
+
+
+def load_metrics(path):
+    with open(path, "r") as f:
+        cached = json.load(f)
+    metricObj = MetricObject(None)
+    metricObj.metrics = cached["metrics"]
+    # json only has string keys, ranks are ints
+    for filename, file_times in cached["rank_times"].items():
+        metricObj.rank_times[filename] = {
+            op: {int(rank): t for rank, t in file_times[op].items()} for op in ("write", "read")
+        }
+    return metricObj, cached["ranks"]
@@ -3,16 +3,13 @@
 from __future__ import absolute_import
 from .creader_wrapper import RecorderReader
 from .build_intervals import *
-from .metrics import MetricObject
+from .metrics import MetricObject, save_metrics
+from .collectives import collective_metrics
+from .summary import FileSummary, print_summary
 from datetime import datetime
 from bisect import bisect_left, bisect_right
 
-
-def filter_intervals(intervals, op):
-    return {
-        filename: [interval for interval in file_intervals if interval[3] == op]
-        for filename, file_intervals in intervals.items()
-    }
+LEVEL_NAMES = {"posix": "POSIX", "mpiio": "MPIIO", "hdf5": "HDF5", "pnetcdf": "PnetCDF"}
 
 
 def get_duration_sum(intervals):
@@ -102,23 +99,18 @@ def assign_metaops(intervals, ioop, metaops_strs):
     return assigned_mops
 
 
-def get_file_bytes(intervals, byte_dict, posix: bool):
-    level = "posix" if posix else "mpiio"
+def get_file_bytes(intervals, byte_dict, level):
 
-    for filename in intervals:
-        if filename not in byte_dict:
-            byte_dict[filename] = {
-                "write": {
-                    "posix": 0.0,
-                    "mpiio": 0.0},
-                "read": {
-                    "posix": 0.0,
-                    "mpiio": 0.0}
+    for file_id in intervals:
+        if file_id not in byte_dict:
+            byte_dict[file_id] = {
+                "write": {l: 0.0 for l in LEVELS},
+                "read": {l: 0.0 for l in LEVELS}
                 }
         sum_write_size = 0
         sum_read_size = 0
 
-        for interval in intervals[filename]:
+        for interval in intervals[file_id]:
             operation, io_size = interval[3], interval[4]
 
             if operation == "read":
@@ -126,21 +118,22 @@ def get_file_bytes(intervals, byte_dict, posix: bool):
             elif operation == "write":
                 sum_write_size += io_size
 
-        byte_dict[filename]["write"][level] = sum_write_size
-        byte_dict[filename]["read"][level] = sum_read_size
+        byte_dict[file_id]["write"][level] = sum_write_size
+        byte_dict[file_id]["read"][level] = sum_read_size
 
 
-def set_byte_counts(file_bytes, metricObj: MetricObject):
+def set_byte_counts(file_bytes, metricObj: MetricObject, file_table):
     
     def get_max_bytes(op_dict):
-        return max(op_dict["posix"], op_dict["mpiio"])
+        return max(op_dict.values())
     
     total_write_bytes = 0
     total_read_bytes = 0
 
-    for filename in file_bytes:
-        max_write_bytes = get_max_bytes(file_bytes[filename]["write"])
-        max_read_bytes = get_max_bytes(file_bytes[filename]["read"])
+    for file_id in file_bytes:
+        filename = file_table.name(file_id)
+        max_write_bytes = get_max_bytes(file_bytes[file_id]["write"])
+        max_read_bytes = get_max_bytes(file_bytes[file_id]["read"])
 
         total_write_bytes += max_write_bytes
         total_read_bytes += max_read_bytes
@@ -154,20 +147,21 @@ def set_byte_counts(file_bytes, metricObj: MetricObject):
     metricObj.metrics["overall"]["read"]["total_bytes"] = total_read_bytes
 
      
-def op_time_pure_bw(intervals, ranks, metricObj: MetricObject, posix: bool):
-    op_time_key = "posix_op_time" if posix else "mpiio_op_time"
-    pure_bw_key = "posix_pure_bw" if posix else "mpiio_pure_bw"
+def op_time_pure_bw(intervals, ranks, metricObj: MetricObject, level, file_table):
+    op_time_key = level + "_op_time"
+    pure_bw_key = level + "_pure_bw"
     files_pure_times = {}
     
-    for filename in intervals:
+    for file_id in intervals:
 
-        files_pure_times[filename] = {}
+        filename = file_table.name(file_id)
+        files_pure_times[file_id] = {}
         write_times = [0.0] * ranks
         read_times = [0.0] * ranks
 
         # aggregate write / read durations for each rank seperately
         # so that only the maximum aggregate duration gets used for bw
-        for interval in intervals[filename]:
+        for interval in intervals[file_id]:
             rank, operation = interval[0], interval[3]
             duration = float(interval[2]) - float(interval[1])
 
@@ -176,8 +170,8 @@ def op_time_pure_bw(intervals, ranks, metricObj: MetricObject, posix: bool):
             elif operation == "write":
                 write_times[rank] += duration
 
-        files_pure_times[filename]["write"] = write_times
-        files_pure_times[filename]["read"] = read_times
+        files_pure_times[file_id]["write"] = write_times
+        files_pure_times[file_id]["read"] = read_times
         
         max_read_time = max(read_times)
         max_write_time = max(write_times)
@@ -194,7 +188,7 @@ def op_time_pure_bw(intervals, ranks, metricObj: MetricObject, posix: bool):
     return files_pure_times
 
 
-def meta_time_e2e_bw(intervals, ranks, metricObj: MetricObject, files_pure_times, posix: bool):
+def meta_time_e2e_bw(intervals, ranks, metricObj: MetricObject, files_pure_times, level, file_table):
     
     def debug_not_assigned(mop_list, mop_type, metaops, rank):
         if mop_list:   
@@ -203,30 +197,32 @@ def meta_time_e2e_bw(intervals, ranks, metricObj: MetricObject, files_pure_times
                     print(f"Rank {rank} unassigned MOp: {x}")
     
 
-    filtered_intervals = {}
     op_strs = ("write", "read", "open", "close", "seek", "sync", "set_size", "ftruncate", "fcntl")
-    for op in op_strs:
-        filtered_intervals[op] = filter_intervals(intervals, op)
+    metaops_strs = ("open", "close", "seek", "sync", "set_size", "ftruncate", "fcntl")
 
-    meta_time_key = "posix_meta_time" if posix else "mpiio_meta_time"
-    e2e_bw_key = "posix_e2e_bw" if posix else "mpiio_e2e_bw"
+    meta_time_key = level + "_meta_time"
+    e2e_bw_key = level + "_e2e_bw"
 
-    for filename in intervals:
+    for file_id in intervals:
 
+        filename = file_table.name(file_id)
         file_times = {"write": {}, "read": {}}
         for op in ("write", "read"):
-            file_times[op]["pure"] = files_pure_times[filename][op]
+            file_times[op]["pure"] = files_pure_times[file_id][op]
             for time in ("open", "close", "all_meta", "e2e"):
                 file_times[op][time] = [0.0] * ranks
-        
-        for rank in range(ranks):
-            # get only intervals of current rank and sort them by tstart
-            rank_intervals = {}
-            for op in op_strs:
-                rank_intervals[op] = sorted([x for x in filtered_intervals[op][filename] if x[0] == rank], key=lambda x: x[1])
 
-            metaops_strs = ("open", "close", "seek", "sync", "set_size", "ftruncate", "fcntl")
+        # group the intervals of the file by rank and operation in one pass,
+        # they are already sorted by tstart. Ranks without intervals keep zero times
+        files_rank_intervals = {}
+        for interval in intervals[file_id]:
+            rank, operation = interval[0], interval[3]
+            if rank not in files_rank_intervals:
+                files_rank_intervals[rank] = {op: [] for op in op_strs}
+            if operation in op_strs:
+                files_rank_intervals[rank][operation].append(interval)
 
+        for rank, rank_intervals in files_rank_intervals.items():
             metaops = {"write": {}, "read": {}}
             for op in ("write", "read"):
                 metaops[op] = assign_metaops(rank_intervals, op, metaops_strs)
@@ -255,15 +251,22 @@ def meta_time_e2e_bw(intervals, ranks, metricObj: MetricObject, files_pure_times
             metricObj.metrics[filename]['read'][meta_time_key] = max_e2e_read
             metricObj.metrics[filename]['read'][e2e_bw_key] = bytes_read / max_e2e_read / (1024 * 1024)
 
+        # keep the per rank e2e times (max over all levels) for run-to-run comparisons
+        for op, op_bytes in (("write", bytes_written), ("read", bytes_read)):
+            if op_bytes == 0: continue
+            rank_times = metricObj.add_rank_times(filename)[op]
+            for rank, e2e_time in enumerate(file_times[op]["e2e"]):
+                if e2e_time != 0:
+                    rank_times[rank] = max(rank_times.get(rank, 0.0), e2e_time)
 
-def aggregate_metrics(metricObj: MetricObject, write: bool):
 
-    def set_agg_metrics(metricObj: MetricObject, op_key, file_metrics, posix: bool):
+def aggregate_metrics(metricObj: MetricObject, write: bool, files=None):
+
+    def set_agg_metrics(metricObj: MetricObject, op_key, file_metrics, level):
         total_bytes = metricObj.metrics['overall'][op_key]['total_bytes']
-        level = "posix" if posix else "mpiio"
     
-        max_op_time = max(x[level + "_op_time"] for x in file_metrics)
-        max_meta_time = max(x[level + "_meta_time"] for x in file_metrics)
+        max_op_time = max((x[level + "_op_time"] for x in file_metrics), default=0.0)
+        max_meta_time = max((x[level + "_meta_time"] for x in file_metrics), default=0.0)
         metricObj.metrics['overall'][op_key]["max_" + level + "_op_time"] = max_op_time
         metricObj.metrics['overall'][op_key]["max_" + level + "_meta_time"] = max_meta_time
         if max_op_time != 0:
@@ -275,105 +278,162 @@ def aggregate_metrics(metricObj: MetricObject, write: bool):
             metricObj.metrics['overall'][op_key]["avg_" + level + "_e2e_bw"] = sum(x[level + "_e2e_bw"] for x in file_metrics) / len(file_metrics)
 
     op_key = "write" if write else "read"
-    file_metrics = [metricObj.metrics[x][op_key] for x in metricObj.metrics if not ignore_filename(x, metricObj)]
-    set_agg_metrics(metricObj, op_key, file_metrics, True)
-    set_agg_metrics(metricObj, op_key, file_metrics, False)
+    if files is None: files = get_report_files(metricObj)
+    file_metrics = [metricObj.metrics[x][op_key] for x in files]
+    for level in LEVELS:
+        set_agg_metrics(metricObj, op_key, file_metrics, level)
+
+    if len(file_metrics) != 0:
+        metricObj.metrics['overall'][op_key]["total_mpiio_coll_ops"] = sum(x["mpiio_coll_ops"] for x in file_metrics)
+        metricObj.metrics['overall'][op_key]["total_mpiio_coll_wait_time"] = sum(x["mpiio_coll_wait_time"] for x in file_metrics)
+        metricObj.metrics['overall'][op_key]["max_mpiio_coll_skew"] = max(x["mpiio_coll_skew"] for x in file_metrics)
 
 
-def print_overall_operation(file, op):
+def print_overall_operation(file, op, levels):
     max_text_len = 49
     decimals = 17
     max_val_len = max(len(str(int(op[x]))) for x in op if x != 'total_bytes') + decimals + 1
 
     file.write(f"\tTotal Bytes: {op['total_bytes']} \n")
-    file.write(f"\tPOSIX Level Metrics:\n")
-    file.write(f"\t\t{'Max Pure Operation Time (s)':<{max_text_len}}: {op['max_posix_op_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_posix_pure_bw']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_posix_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\t\t{'Max E2E Operation Time (s)':<{max_text_len}}: {op['max_posix_meta_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_posix_e2e_bw']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_posix_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\tMPIIO Level Metrics:\n")
-    file.write(f"\t\t{'Max Pure Operation Time (s)':<{max_text_len}}: {op['max_mpiio_op_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_mpiio_pure_bw']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_mpiio_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\t\t{'Max E2E Operation Time (s)':<{max_text_len}}: {op['max_mpiio_meta_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_mpiio_e2e_bw']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_mpiio_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
-
-
-def print_file_operation(file, op):
+    for level in levels:
+        file.write(f"\t{LEVEL_NAMES[level]} Level Metrics:\n")
+        file.write(f"\t\t{'Max Pure Operation Time (s)':<{max_text_len}}: {op['max_' + level + '_op_time']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'Pure Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_' + level + '_pure_bw']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'Pure Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_' + level + '_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
+        file.write(f"\t\t{'Max E2E Operation Time (s)':<{max_text_len}}: {op['max_' + level + '_meta_time']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'E2E Operation Bandwidth with Max Op Time (MiB/s)':<{max_text_len}}: {op['agg_' + level + '_e2e_bw']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'E2E Operation Bandwidth as File BW Avg (MiB/s)':<{max_text_len}}: {op['avg_' + level + '_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
+        if level == "mpiio" and op['total_mpiio_coll_ops'] != 0:
+            file.write(f"\t\tCollective Operations: {op['total_mpiio_coll_ops']} \n")
+            file.write(f"\t\t{'Total Collective Wait Time (s)':<{max_text_len}}: {op['total_mpiio_coll_wait_time']:>{max_val_len}.{decimals}f} \n")
+            file.write(f"\t\t{'Max Collective Skew (s)':<{max_text_len}}: {op['max_mpiio_coll_skew']:>{max_val_len}.{decimals}f} \n\n")
+
+
+def print_file_operation(file, op, levels):
     max_text_len = 32
     decimals = 17
     max_val_len = max(len(str(int(op[x]))) for x in op if x != 'bytes') + decimals + 1
     
     file.write(f"\tBytes: {op['bytes']} \n")
-    file.write(f"\tPOSIX Level Metrics:\n")
-    file.write(f"\t\t{'Pure Operation Time (s)':<{max_text_len}}: {op['posix_op_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth (MiB/s)':<{max_text_len}}: {op['posix_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\t\t{'E2E Operation Time (s)':<{max_text_len}}: {op['posix_meta_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth (MiB/s)':<{max_text_len}}: {op['posix_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\tMPIIO Level Metrics:\n")
-    file.write(f"\t\t{'Pure Operation Time (s)':<{max_text_len}}: {op['mpiio_op_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'Pure Operation Bandwidth (MiB/s)':<{max_text_len}}: {op['mpiio_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
-    file.write(f"\t\t{'E2E Operation Time (s)':<{max_text_len}}: {op['mpiio_meta_time']:>{max_val_len}.{decimals}f} \n")
-    file.write(f"\t\t{'E2E Operation Bandwidth (MiB/s)':<{max_text_len}}: {op['mpiio_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
+    for level in levels:
+        file.write(f"\t{LEVEL_NAMES[level]} Level Metrics:\n")
+        file.write(f"\t\t{'Pure Operation Time (s)':<{max_text_len}}: {op[level + '_op_time']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'Pure Operation Bandwidth (MiB/s)':<{max_text_len}}: {op[level + '_pure_bw']:>{max_val_len}.{decimals}f} \n\n")
+        file.write(f"\t\t{'E2E Operation Time (s)':<{max_text_len}}: {op[level + '_meta_time']:>{max_val_len}.{decimals}f} \n")
+        file.write(f"\t\t{'E2E Operation Bandwidth (MiB/s)':<{max_text_len}}: {op[level + '_e2e_bw']:>{max_val_len}.{decimals}f} \n\n")
+        if level == "mpiio" and op['mpiio_coll_ops'] != 0:
+            file.write(f"\t\tCollective Operations: {op['mpiio_coll_ops']} \n")
+            file.write(f"\t\t{'Collective Time (s)':<{max_text_len}}: {op['mpiio_coll_time']:>{max_val_len}.{decimals}f} \n")
+            file.write(f"\t\t{'Collective Wait Time (s)':<{max_text_len}}: {op['mpiio_coll_wait_time']:>{max_val_len}.{decimals}f} \n")
+            file.write(f"\t\t{'Max Collective Skew (s)':<{max_text_len}}: {op['mpiio_coll_skew']:>{max_val_len}.{decimals}f} \n")
+            file.write(f"\t\t{'Collective Bandwidth (MiB/s)':<{max_text_len}}: {op['mpiio_coll_bw']:>{max_val_len}.{decimals}f} \n\n")
+
+
+def has_metrics(file_metrics):
+    # all other metrics of a file are derived from its bytes, op times and
+    # collective instances, so they are zero if these are zero
+    for op_key in ("write", "read"):
+        op = file_metrics[op_key]
+        if op["bytes"] != 0 or op["mpiio_coll_ops"] != 0 or any(op[level + "_op_time"] != 0 for level in LEVELS):
+            return True
+    return False
 
 
 def ignore_filename(filename, metricObj: MetricObject):
     if filename == "overall":
         return True
-    return all(x == 0 for x in metricObj.metrics[filename]['write'].values()) and all(x == 0 for x in metricObj.metrics[filename]['read'].values())
+    return not has_metrics(metricObj.metrics[filename])
 
 
-def print_metrics(reader, output_path):
-    start = datetime.now()
-    metrics = MetricObject(reader)
-    ranks = reader.GM.total_ranks
+def get_levels(intervals):
+    # POSIX and MPI-IO are always reported, the library levels only if they were used
+    return [level for level in LEVELS if level in ("posix", "mpiio") or intervals[level]]
 
-    posix_intervals = build_intervals(reader, True)
-    mpiio_intervals = build_intervals(reader, False)
-
-    file_bytes = {}
-    get_file_bytes(posix_intervals, file_bytes, True)
-    get_file_bytes(mpiio_intervals, file_bytes, False)
-    set_byte_counts(file_bytes, metrics)
 
-    posix_pure_times = op_time_pure_bw(posix_intervals, ranks, metrics, True)
-    meta_time_e2e_bw(posix_intervals, ranks, metrics, posix_pure_times, True)
+# summary: if given, the non-ignored files are added to this FileSummary
+# returns the metrics and the list of reported (non-ignored) files
+def compute_metrics(reader, intervals, ranks, file_table, summary=None):
+    metrics = MetricObject(reader)
 
-    mpiio_pure_times = op_time_pure_bw(mpiio_intervals, ranks, metrics, False)
-    meta_time_e2e_bw(mpiio_intervals, ranks, metrics, mpiio_pure_times, False)
+    file_bytes = {}
+    for level in LEVELS:
+        get_file_bytes(intervals[level], file_bytes, level)
+    set_byte_counts(file_bytes, metrics, file_table)
+
+    collective_metrics(intervals["mpiio"], metrics, file_table)
+
+    # the metrics of a file are final after the last level it has intervals on,
+    # it is then checked once and added to the summary
+    last_level = {}
+    for level in LEVELS:
+        for file_id in intervals[level]:
+            last_level[file_id] = level
+
+    reported = set()
+    for level in LEVELS:
+        pure_times = op_time_pure_bw(intervals[level], ranks, metrics, level, file_table)
+        meta_time_e2e_bw(intervals[level], ranks, metrics, pure_times, level, file_table)
+        for file_id in intervals[level]:
+            if last_level[file_id] != level: continue
+            filename = file_table.name(file_id)
+            if not has_metrics(metrics.metrics[filename]): continue
+            reported.add(filename)
+            if summary is not None:
+                summary.add(filename, metrics.metrics[filename])
+
+    # report files in the order of the metrics
+    files = [x for x in metrics.metrics if x in reported]
+    aggregate_metrics(metrics, True, files)
+    aggregate_metrics(metrics, False, files)
+    return metrics, files
+
+
+def get_report_files(metricObj: MetricObject):
+    return [x for x in metricObj.metrics if not ignore_filename(x, metricObj)]
+
+
+def print_metrics(reader, output_path, top_k=None, prefix_depth=3, metrics_path=None, file_filter=None):
+    start = datetime.now()
+    ranks = reader.GM.total_ranks
 
-    aggregate_metrics(metrics, True)
-    aggregate_metrics(metrics, False)
+    intervals, file_table = build_intervals(reader, file_filter=file_filter)
+    # with top_k only a bounded summary of the files is kept for the report
+    summary = FileSummary(top_k, prefix_depth) if top_k is not None else None
+    metrics, files = compute_metrics(reader, intervals, ranks, file_table, summary)
+    levels = get_levels(intervals)
+    if metrics_path is not None:
+        save_metrics(metrics, ranks, metrics_path)
 
-    
     with open(output_path, "w") as f:
         f.write(f"{'=' * 50}\n")
         f.write(f"Overall Metrics:\n")
         f.write(f"{'=' * 50}\n")
         f.write("Write:\n")
-        print_overall_operation(f, metrics.metrics['overall']['write'])
+        print_overall_operation(f, metrics.metrics['overall']['write'], levels)
         f.write("Read:\n")
-        print_overall_operation(f, metrics.metrics['overall']['read'])
-
-        f.write(f"\n{'=' * 50}\n")
-        f.write(f"Per File Metrics: \n")
-        f.write(f"{'=' * 50}")
-        for filename in metrics.metrics:
-            if ignore_filename(filename, metrics): continue
-            f.write(f"\n{'-' * (len(filename) + 6)}\n")
-            f.write(f"File: {filename}\n")
-            f.write(f"Write:\n")
-            print_file_operation(f, metrics.metrics[filename]['write'])
-            f.write(f"Read:\n")
-            print_file_operation(f, metrics.metrics[filename]['read'])
+        print_overall_operation(f, metrics.metrics['overall']['read'], levels)
+
+        if summary is not None:
+            print_summary(f, summary)
+        else:
+            print_file_metrics(f, metrics, files, levels)
     stop = datetime.now()
     duration = stop - start
     print(f"[recorder-pm]: Total processing time: {duration}")
 
-        
+
+def print_file_metrics(f, metrics: MetricObject, files, levels):
+    f.write(f"\n{'=' * 50}\n")
+    f.write(f"Per File Metrics: \n")
+    f.write(f"{'=' * 50}")
+    for filename in files:
+        f.write(f"\n{'-' * (len(filename) + 6)}\n")
+        f.write(f"File: {filename}\n")
+        f.write(f"Write:\n")
+        print_file_operation(f, metrics.metrics[filename]['write'], levels)
+        f.write(f"Read:\n")
+        print_file_operation(f, metrics.metrics[filename]['read'], levels)
+
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# encoding: utf-8
+import math, os, random
+from datetime import datetime
+from .build_intervals import build_intervals
+from .reporter import compute_metrics, get_levels, LEVEL_NAMES
+
+# two-sided 95% quantiles of the t distribution, by degrees of freedom
+T_QUANTILES = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+               8: 2.306, 9: 2.262, 10: 2.228, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t_quantile(df):
+    # between tabulated values the next smaller df is used, its quantile is larger
+    # and keeps the interval conservative
+    return T_QUANTILES[max(x for x in T_QUANTILES if x <= df)]
+
+
+def sample_ranks(total_ranks, fraction, groups, seed=0):
+    # neighbouring ranks usually share a node and behave alike, so the ranks are
+    # split into blocks of consecutive ranks (strata) and every random group gets
+    # one random rank of each block. Each group is a stratified sample on its own,
+    # the spread of the group estimates gives the confidence intervals.
+    rng = random.Random(seed)
+    groups = max(1, min(groups, total_ranks))
+    n_strata = max(1, min(round(total_ranks * fraction / groups), total_ranks // groups))
+
+    group_ranks = [[] for _ in range(groups)]
+    for s in range(n_strata):
+        stratum = range(s * total_ranks // n_strata, (s + 1) * total_ranks // n_strata)
+        for group, rank in enumerate(rng.sample(stratum, groups)):
+            group_ranks[group].append(rank)
+    return group_ranks
+
+
+def sample_files(intervals, fraction, file_table, seed=0):
+    # files shared by several of the sampled ranks are always kept, the remaining
+    # files are stratified by directory, every directory keeps at least one file.
+    # returns file id -> weight (number of files in the directory / sampled files)
+    rng = random.Random(seed)
+    file_ranks = {}
+    for level_intervals in intervals.values():
+        for file_id, file_intervals in level_intervals.items():
+            file_ranks.setdefault(file_id, set()).update(x[0] for x in file_intervals)
+
+    file_weights = {}
+    directories = {}
+    for file_id, ranks in file_ranks.items():
+        if len(ranks) > 1:
+            file_weights[file_id] = 1.0
+        else:
+            directories.setdefault(os.path.dirname(file_table.name(file_id)), set()).add(file_id)
+
+    for directory in sorted(directories):
+        files = sorted(directories[directory])
+        kept = rng.sample(files, max(1, math.ceil(len(files) * fraction)))
+        for file_id in kept:
+            file_weights[file_id] = len(files) / len(kept)
+    return file_weights
+
+
+def subset_intervals(intervals, ranks, file_weights):
+    # keep only the intervals of the given ranks and files,
+    # ranks get renumbered to 0..len(ranks)-1 so that per rank lists stay small
+    rank_index = {rank: i for i, rank in enumerate(ranks)}
+    subset = {}
+    for level, level_intervals in intervals.items():
+        subset[level] = {}
+        for file_id, file_intervals in level_intervals.items():
+            if file_id not in file_weights: continue
+            kept = [[rank_index[x[0]]] + x[1:] for x in file_intervals if x[0] in rank_index]
+            if kept:
+                subset[level][file_id] = kept
+    return subset
+
+
+def estimate_overall(metricObj, files, file_weights, rank_weight, levels, file_table):
+    # analogous to aggregate_metrics, but bytes and file averages are weighted
+    # with the inverse sampling probabilities of files and ranks
+    estimates = {}
+
+    for op_key in ("write", "read"):
+        file_metrics = [(file_weights[file_table.ids[x]], metricObj.metrics[x][op_key]) for x in files]
+        weight_sum = sum(w for w, _ in file_metrics)
+        total_bytes = rank_weight * sum(w * x["bytes"] for w, x in file_metrics)
+
+        estimate = {"total_bytes": total_bytes}
+        for level in levels:
+            max_op_time = max((x[level + "_op_time"] for _, x in file_metrics), default=0.0)
+            max_meta_time = max((x[level + "_meta_time"] for _, x in file_metrics), default=0.0)
+            estimate["max_" + level + "_op_time"] = max_op_time
+            estimate["max_" + level + "_meta_time"] = max_meta_time
+            estimate["agg_" + level + "_pure_bw"] = total_bytes / max_op_time / (1024*1024) if max_op_time != 0 else 0.0
+            estimate["agg_" + level + "_e2e_bw"] = total_bytes / max_meta_time / (1024*1024) if max_meta_time != 0 else 0.0
+            estimate["avg_" + level + "_pure_bw"] = sum(w * x[level + "_pure_bw"] for w, x in file_metrics) / weight_sum if weight_sum != 0 else 0.0
+            estimate["avg_" + level + "_e2e_bw"] = sum(w * x[level + "_e2e_bw"] for w, x in file_metrics) / weight_sum if weight_sum != 0 else 0.0
+        estimates[op_key] = estimate
+    return estimates
+
+
+def has_confidence(metric):
+    # totals and averages are unbiased estimates. A max over the sampled ranks and files
+    # is only a lower bound of the real max (and bandwidths derived from it an upper bound),
+    # the spread of the groups says nothing about its distance to the real value
+    return metric == "total_bytes" or metric.startswith("avg_")
+
+
+def get_confidence(estimates, group_estimates):
+    # random group variance estimator: var = sum((x_g - mean)^2) / (G * (G - 1))
+    groups = len(group_estimates)
+    half_widths = {}
+    for op_key in estimates:
+        half_widths[op_key] = {}
+        for metric in estimates[op_key]:
+            if not has_confidence(metric):
+                continue
+            if groups < 2:
+                half_widths[op_key][metric] = float("nan")
+                continue
+            values = [x[op_key][metric] for x in group_estimates]
+            mean = sum(values) / groups
+            variance = sum((x - mean) ** 2 for x in values) / (groups * (groups - 1))
+            half_widths[op_key][metric] = t_quantile(groups - 1) * math.sqrt(variance)
+    return half_widths
+
+
+def print_sample_operation(file, estimate, half_width, levels):
+    max_text_len = 49
+    decimals = 6
+
+    def write_line(text, key):
+        if key in half_width:
+            file.write(f"\t\t{text:<{max_text_len}}: {estimate[key]:.{decimals}f} +/- {half_width[key]:.{decimals}f} (estimated)\n")
+        elif key.startswith("max_"):
+            file.write(f"\t\t{text:<{max_text_len}}: {estimate[key]:.{decimals}f} (lower bound, no CI)\n")
+        else:
+            file.write(f"\t\t{text:<{max_text_len}}: {estimate[key]:.{decimals}f} (upper bound, no CI)\n")
+
+    file.write(f"\tTotal Bytes: {estimate['total_bytes']:.0f} +/- {half_width['total_bytes']:.0f} (estimated)\n")
+    for level in levels:
+        file.write(f"\t{LEVEL_NAMES[level]} Level Metrics:\n")
+        write_line('Max Pure Operation Time (s)', 'max_' + level + '_op_time')
+        write_line('Pure Operation Bandwidth with Max Op Time (MiB/s)', 'agg_' + level + '_pure_bw')
+        write_line('Pure Operation Bandwidth as File BW Avg (MiB/s)', 'avg_' + level + '_pure_bw')
+        file.write("\n")
+        write_line('Max E2E Operation Time (s)', 'max_' + level + '_meta_time')
+        write_line('E2E Operation Bandwidth with Max Op Time (MiB/s)', 'agg_' + level + '_e2e_bw')
+        write_line('E2E Operation Bandwidth as File BW Avg (MiB/s)', 'avg_' + level + '_e2e_bw')
+        file.write("\n")
+
+
+def print_sample_metrics(reader, output_path, fraction=0.05, groups=5, seed=0, file_filter=None):
+    start = datetime.now()
+    total_ranks = reader.GM.total_ranks
+
+    group_ranks = sample_ranks(total_ranks, fraction, groups, seed)
+    ranks = sorted(rank for group in group_ranks for rank in group)
+
+    intervals, file_table = build_intervals(reader, ranks, file_filter)
+    file_weights = sample_files(intervals, fraction, file_table, seed)
+    levels = get_levels(intervals)
+
+    sample, files = compute_metrics(reader, subset_intervals(intervals, ranks, file_weights), len(ranks), file_table)
+    estimates = estimate_overall(sample, files, file_weights, total_ranks / len(ranks), levels, file_table)
+
+    group_estimates = []
+    for group in group_ranks:
+        group_sample, group_files = compute_metrics(reader, subset_intervals(intervals, group, file_weights), len(group), file_table)
+        group_estimates.append(estimate_overall(group_sample, group_files, file_weights, total_ranks / len(group), levels, file_table))
+    half_widths = get_confidence(estimates, group_estimates)
+
+    seen_files = len(set(file_id for level_intervals in intervals.values() for file_id in level_intervals))
+    with open(output_path, "w") as f:
+        f.write(f"{'=' * 50}\n")
+        f.write(f"Overall Metrics (ESTIMATED FROM A SAMPLE):\n")
+        f.write(f"{'=' * 50}\n")
+        f.write(f"Sampled ranks: {len(ranks)} of {total_ranks} in {len(group_ranks)} groups\n")
+        f.write(f"Sampled files: {len(file_weights)} of {seen_files} accessed by the sampled ranks\n")
+        f.write(f"Totals and averages are estimates with 95% confidence intervals (value +/- half width),\n")
+        f.write(f"max times are lower bounds and the bandwidths derived from them upper bounds\n\n")
+        f.write("Write:\n")
+        print_sample_operation(f, estimates['write'], half_widths['write'], levels)
+        f.write("Read:\n")
+        print_sample_operation(f, estimates['read'], half_widths['read'], levels)
+    stop = datetime.now()
+    duration = stop - start
+    print(f"[recorder-pm]: Total processing time: {duration}")
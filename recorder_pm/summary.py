@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# encoding: utf-8
+import heapq, os
+from .build_intervals import LEVELS
+
+
+def get_e2e_time(file_metrics):
+    # e2e time of a file is the one of its slowest level
+    return max(file_metrics[level + "_meta_time"] for level in LEVELS)
+
+
+def get_prefix(filename, depth):
+    # e.g. depth 2: /p/lustre/user/run/out.0 -> /p/lustre, run/out.0 -> run
+    # the directory is cut, the file name itself is never part of the prefix
+    directory = os.path.dirname(filename)
+    parts = directory.split("/")
+    if directory.startswith("/"):
+        return "/".join(parts[:depth + 1]) or "/"
+    return "/".join(parts[:depth]) or "."
+
+
+class FileSummary():
+    """
+    Summarized per file metrics:
+        keeps only the top k files by e2e time, by bytes
+        and by lowest e2e bandwidth in bounded heaps (per write / read),
+        every file is also added to the rollup of its path prefix.
+    """
+    def __init__(self, k=10, prefix_depth=3):
+        self.k = k
+        self.prefix_depth = prefix_depth
+        self.num_files = 0
+        # heaps[write/read][ranking] is a min-heap of (value, filename),
+        # lowest bandwidth is kept as negative value so that the heap root is the one to drop
+        self.heaps = {op: {"e2e_time": [], "bytes": [], "low_bw": []} for op in ("write", "read")}
+        # directories[prefix] = {"files": number of files, "write": {...}, "read": {...}}
+        self.directories = {}
+
+    def push(self, heap, value, filename):
+        if len(heap) < self.k:
+            heapq.heappush(heap, (value, filename))
+        elif (value, filename) > heap[0]:
+            heapq.heapreplace(heap, (value, filename))
+
+    def add(self, filename, file_metrics):
+        self.num_files += 1
+        prefix = get_prefix(filename, self.prefix_depth)
+        if prefix not in self.directories:
+            self.directories[prefix] = {
+                "files": 0,
+                "write": {"bytes": 0, "max_e2e_time": 0.0},
+                "read": {"bytes": 0, "max_e2e_time": 0.0}
+            }
+        directory = self.directories[prefix]
+        directory["files"] += 1
+
+        for op_key in ("write", "read"):
+            file_bytes = file_metrics[op_key]["bytes"]
+            e2e_time = get_e2e_time(file_metrics[op_key])
+            heaps = self.heaps[op_key]
+
+            if e2e_time != 0:
+                self.push(heaps["e2e_time"], e2e_time, filename)
+            if file_bytes != 0:
+                self.push(heaps["bytes"], file_bytes, filename)
+            if e2e_time != 0 and file_bytes != 0:
+                self.push(heaps["low_bw"], -(file_bytes / e2e_time / (1024*1024)), filename)
+
+            directory[op_key]["bytes"] += file_bytes
+            directory[op_key]["max_e2e_time"] = max(directory[op_key]["max_e2e_time"], e2e_time)
+
+    def get_top(self, op_key, ranking):
+        top = sorted(self.heaps[op_key][ranking], reverse=True)
+        if ranking == "low_bw":
+            return [(-value, filename) for value, filename in top]
+        return top
+
+
+def print_summary(file, summary: FileSummary):
+    rankings = (
+        ("e2e_time", "Longest E2E Operation Time (s)"),
+        ("bytes", "Most Bytes"),
+        ("low_bw", "Lowest E2E Bandwidth (MiB/s)"),
+    )
+    file.write(f"\n{'=' * 50}\n")
+    file.write(f"Top {summary.k} Files of {summary.num_files}: \n")
+    file.write(f"{'=' * 50}\n")
+    for op_key in ("write", "read"):
+        file.write(f"{op_key.capitalize()}:\n")
+        for ranking, title in rankings:
+            file.write(f"\t{title}:\n")
+            for i, (value, filename) in enumerate(summary.get_top(op_key, ranking)):
+                file.write(f"\t\t{i + 1:>3}. {value:>24.6f}  {filename}\n")
+            file.write("\n")
+
+    file.write(f"{'=' * 50}\n")
+    file.write(f"Per Directory Metrics (path prefix depth {summary.prefix_depth}): \n")
+    file.write(f"{'=' * 50}")
+    for prefix in sorted(summary.directories):
+        directory = summary.directories[prefix]
+        file.write(f"\n{'-' * (len(prefix) + 11)}\n")
+        file.write(f"Directory: {prefix}\n")
+        file.write(f"\tFiles: {directory['files']} \n")
+        for op_key in ("write", "read"):
+            file.write(f"\t{op_key.capitalize()} Bytes: {directory[op_key]['bytes']} \n")
+            file.write(f"\t{'Max ' + op_key.capitalize() + ' E2E Operation Time (s)'}: {directory[op_key]['max_e2e_time']:.17f} \n")
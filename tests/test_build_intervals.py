@@ -0,0 +1,142 @@
+import pytest
+from types import SimpleNamespace
+from recorder_pm.build_intervals import (build_intervals, get_level, get_hdf5_operation, get_pnetcdf_operation,
+                                         get_h5_type_size, get_dims_product, Hdf5Sizes)
+
+# a native type passed as hid_t
+NATIVE_INT_ID = "216172782113783851"
+
+
+class Record():
+    def __init__(self, tstart, tend, func_id, args):
+        self.tstart, self.tend, self.func_id, self.args = tstart, tend, func_id, args
+
+    def args_to_strs(self):
+        return list(self.args)
+
+
+def make_reader(rank_records):
+    # rank_records: per rank a list of (func, args, tstart, tend)
+    funcs = sorted(set(func for records in rank_records for func, _, _, _ in records))
+    return SimpleNamespace(
+        funcs=funcs,
+        GM=SimpleNamespace(total_ranks=len(rank_records)),
+        LMs=[SimpleNamespace(total_records=len(records)) for records in rank_records],
+        records=[[Record(tstart, tend, funcs.index(func), args) for func, args, tstart, tend in records]
+                 for records in rank_records]
+    )
+
+
+def hdf5_intervals(records):
+    intervals, files = build_intervals(make_reader([records]))
+    return {files.name(file_id): x for file_id, x in intervals["hdf5"].items()}
+
+
+def data_bytes(intervals):
+    return [x[4] for x in intervals if x[3] in ("write", "read")]
+
+
+@pytest.mark.parametrize("func, level", [
+    ("write", "posix"), ("sync_file_range", "posix"), ("MPI_File_write_at_all", "mpiio"),
+    ("H5Dwrite", "hdf5"), ("ncmpi_put_vara_int_all", "pnetcdf"),
+    ("MPI_Barrier", None), ("nc_put_var", None),
+])
+def test_get_level(func, level):
+    assert get_level(func) == level
+
+
+def test_get_hdf5_operation():
+    assert get_hdf5_operation("H5Dwrite", [])[0] == "write"
+    assert get_hdf5_operation("H5Dread", [])[0] == "read"
+    assert get_hdf5_operation("H5Fcreate", ["/a.h5"]) == ("open", 0)
+    assert get_hdf5_operation("H5Fclose", ["1"]) == ("close", 0)
+    assert get_hdf5_operation("H5Pcreate", ["1"]) == (None, 0)
+
+
+def test_get_pnetcdf_operation():
+    assert get_pnetcdf_operation("ncmpi_put_att_text", ["nc", "0", "title", "5", "0x1"]) == (None, 0)
+    assert get_pnetcdf_operation("ncmpi_put_vara_int_all", ["nc", "1", "[0]", "[5]", "0x1"]) == ("write", 20)
+    assert get_pnetcdf_operation("ncmpi_get_var1_double", ["nc", "1", "[3]", "0x1"]) == ("read", 8)
+    # flexible API: bufcount and buftype are the last two arguments
+    assert get_pnetcdf_operation("ncmpi_put_vara_all", ["nc", "1", "[0]", "[5]", "0x1", "5", "MPI_DOUBLE"]) == ("write", 40)
+    assert get_pnetcdf_operation("ncmpi_iput_vara_int", ["nc", "1", "[0]", "[5]", "0x1", "0x2"]) == (None, 0)
+    assert get_pnetcdf_operation("ncmpi_create", ["comm", "/a.nc", "0", "info", "nc"]) == ("open", 0)
+
+
+@pytest.mark.parametrize("type_str, size", [
+    ("H5T_NATIVE_INT", 4), ("H5T_NATIVE_DOUBLE", 8), ("H5T_STD_I32LE", 4),
+    ("H5T_IEEE_F64BE", 8), ("H5T_NATIVE_INT16", 2), (NATIVE_INT_ID, 0),
+])
+def test_get_h5_type_size(type_str, size):
+    assert get_h5_type_size(type_str) == size
+
+
+@pytest.mark.parametrize("arg_str, product", [
+    ("[10,10]", 100), ("[4]", 4), ("[0,0]", 0), ("12345", 0), ("0x7ffd", 0), ("NULL", 0),
+])
+def test_get_dims_product(arg_str, product):
+    assert get_dims_product(arg_str) == product
+
+
+def test_hdf5_sizes_from_arguments():
+    sizes = Hdf5Sizes()
+    sizes.update(0, "H5Sselect_hyperslab", ["200", "0", "[0,0]", "NULL", "[5,2]", "NULL"])
+    sizes.update(0, "H5Sselect_hyperslab", ["200", "H5S_SELECT_OR", "[5,0]", "NULL", "[1,2]", "[2,1]"])
+    sizes.update(0, "H5Tset_size", ["77", "16"])
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "201", "200", "0", "0x1"]) == 14 * 4
+    assert sizes.get_count(0, ["300", "77", "201", "200", "0", "0x1"]) == 14 * 16
+    # selections and types are per rank
+    assert sizes.get_count(1, ["300", "H5T_NATIVE_INT", "201", "200", "0", "0x1"]) is None
+    assert sizes.get_count(0, ["300", NATIVE_INT_ID, "201", "200", "0", "0x1"]) is None
+
+    sizes.update(0, "H5Sclose", ["200"])
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "201", "200", "0", "0x1"]) is None
+
+    sizes.update(0, "H5Sset_extent_simple", ["202", "2", "[3,3]", "NULL"])
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "202", "202", "0", "0x1"]) == 9 * 4
+    sizes.update(0, "H5Sselect_none", ["202"])
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "202", "202", "0", "0x1"]) == 0
+
+    # whole dataset accesses need the extent of the dataset
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "0", "0", "0", "0x1"]) is None
+    sizes.update(0, "H5Dset_extent", ["300", "[20]"])
+    assert sizes.get_count(0, ["300", "H5T_NATIVE_INT", "0", "0", "0", "0x1"]) == 20 * 4
+
+
+def test_hyperslab_write():
+    # H5Dget_space -> H5Sselect_hyperslab -> H5Screate_simple (memspace) -> H5Dwrite
+    records = [
+        ("H5Fcreate", ["/a.h5", "0", "0", "0"], 1.0, 1.1),
+        ("H5Dget_space", ["300"], 2.0, 2.1),
+        ("H5Sselect_hyperslab", ["200", "0", "[0,0]", "NULL", "[5,2]", "NULL"], 3.0, 3.1),
+        ("H5Screate_simple", ["2", "[5,2]", "NULL"], 4.0, 4.1),
+        ("H5Dwrite", ["300", "H5T_NATIVE_DOUBLE", "201", "200", "0", "0x1"], 5.0, 6.0),
+        ("H5Fclose", ["1"], 9.0, 9.1),
+    ]
+    assert data_bytes(hdf5_intervals(records)["/a.h5"]) == [80]
+
+
+@pytest.mark.parametrize("mem_type", ["H5T_NATIVE_INT", NATIVE_INT_ID])
+def test_whole_dataset_write_is_sized_by_nested_io(mem_type):
+    # H5Dwrite(dset, type, H5S_ALL, H5S_ALL), the MPI-IO call HDF5 issued runs within it
+    records = [
+        ("H5Fcreate", ["/a.h5", "0", "0", "0"], 1.0, 1.5),
+        ("MPI_File_open", ["comm", "/a.h5", "0", "info", "fh"], 1.1, 1.2),
+        ("H5Screate_simple", ["2", "[10,10]", "NULL"], 2.0, 2.1),
+        ("H5Dcreate2", ["1", "d", mem_type, "200", "0", "0", "0"], 3.0, 3.1),
+        ("H5Dwrite", ["300", mem_type, "0", "0", "0", "0x1"], 5.0, 6.0),
+        ("MPI_File_write_at_all", ["fh", "2048", "0x1", "400", "MPI_BYTE"], 5.1, 5.9),
+        ("H5Fclose", ["1"], 9.0, 9.5),
+        ("MPI_File_close", ["fh"], 9.1, 9.2),
+    ]
+    assert data_bytes(hdf5_intervals(records)["/a.h5"]) == [400]
+
+
+def test_unsized_write_is_skipped(capsys):
+    records = [
+        ("H5Fcreate", ["/a.h5", "0", "0", "0"], 1.0, 1.1),
+        ("H5Dwrite", ["300", NATIVE_INT_ID, "0", "0", "0", "0x1"], 5.0, 6.0),
+        ("H5Fclose", ["1"], 9.0, 9.1),
+    ]
+    assert data_bytes(hdf5_intervals(records)["/a.h5"]) == []
+    assert "skipped 1 HDF5 write / read calls" in capsys.readouterr().out
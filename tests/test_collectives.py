@@ -0,0 +1,71 @@
+import io
+from recorder_pm.build_intervals import LEVELS
+from recorder_pm.collectives import is_collective, match_collectives
+from recorder_pm.file_table import FileTable
+from recorder_pm.reporter import compute_metrics, print_overall_operation, get_levels
+
+
+def interval(rank, tstart, tend, func="MPI_File_write_at_all", operation="write", count=100, session=0):
+    return [rank, tstart, tend, operation, count, func, session]
+
+
+def test_is_collective():
+    assert is_collective("MPI_File_write_all")
+    assert is_collective("MPI_File_read_at_all")
+    assert is_collective("MPI_File_write_ordered")
+    assert not is_collective("MPI_File_write_at")
+    assert not is_collective("MPI_File_open")
+
+
+def test_nth_calls_of_ranks_are_matched():
+    intervals = [
+        interval(0, 1.0, 2.0), interval(1, 1.5, 2.5),
+        interval(0, 3.0, 4.0), interval(1, 3.2, 4.5),
+    ]
+    instances = sorted(match_collectives(intervals), key=lambda x: x[2])
+    assert len(instances) == 2
+    operation, ranks, min_start, max_start, max_end, sum_starts, count = instances[0]
+    assert (operation, ranks, min_start, max_start, max_end, count) == ("write", 2, 1.0, 1.5, 2.5, 200)
+    assert sum_starts == 2.5
+    assert instances[1][1:5] == [2, 3.0, 3.2, 4.5]
+
+
+def test_independent_and_metadata_calls_are_skipped():
+    intervals = [
+        interval(0, 0.0, 0.1, "MPI_File_open", "open", 0),
+        interval(0, 1.0, 2.0, "MPI_File_write_at"),
+        interval(0, 2.0, 3.0),
+        interval(1, 2.5, 3.5),
+    ]
+    instances = list(match_collectives(intervals))
+    assert len(instances) == 1
+    assert instances[0][1:4] == [2, 2.0, 2.5]
+
+
+def test_calls_are_matched_per_open_session():
+    # rank 0 reopened the file, its call in the second session must not be
+    # matched with the second call of rank 1 in the first session
+    intervals = [
+        interval(0, 1.0, 1.5), interval(1, 1.1, 1.6),
+        interval(1, 2.1, 2.6),
+        interval(0, 4.0, 4.5, session=1),
+    ]
+    instances = sorted(match_collectives(intervals), key=lambda x: x[2])
+    assert [x[1] for x in instances] == [2, 1, 1]
+    assert [x[2] for x in instances] == [1.0, 2.1, 4.0]
+
+
+def test_overall_collectives_without_skew():
+    files = FileTable()
+    file_id = files.get_id("/data/shared")
+    intervals = {level: {} for level in LEVELS}
+    # both ranks enter at the same time, the skew is zero
+    intervals["mpiio"][file_id] = [interval(0, 1.0, 2.0), interval(1, 1.0, 2.0)]
+    metrics, _ = compute_metrics(None, intervals, 2, files)
+    overall = metrics.metrics["overall"]["write"]
+    assert overall["total_mpiio_coll_ops"] == 1
+    assert overall["max_mpiio_coll_skew"] == 0.0
+
+    report = io.StringIO()
+    print_overall_operation(report, overall, get_levels(intervals))
+    assert "Collective Operations: 1" in report.getvalue()
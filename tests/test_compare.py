@@ -0,0 +1,32 @@
+from recorder_pm.compare import mann_whitney_greater, normalize_filename, MIN_SAMPLES
+
+
+def test_too_few_samples_are_not_tested():
+    assert mann_whitney_greater([1.0] * (MIN_SAMPLES - 1), [2.0] * 10) is None
+    assert mann_whitney_greater([1.0] * 10, [2.0] * (MIN_SAMPLES - 1)) is None
+
+
+def test_greater_new_values_are_significant():
+    base = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02]
+    new = [2.0, 2.1, 1.9, 2.05, 1.95, 2.02]
+    assert mann_whitney_greater(base, new) < 0.01
+
+
+def test_smaller_new_values_are_not_significant():
+    base = [2.0, 2.1, 1.9, 2.05, 1.95, 2.02]
+    new = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02]
+    assert mann_whitney_greater(base, new) > 0.99
+
+
+def test_identical_values():
+    # all values tied, there is no evidence for a difference
+    assert mann_whitney_greater([1.0] * 5, [1.0] * 5) == 1.0
+
+
+def test_ties_between_runs():
+    p_value = mann_whitney_greater([1.0, 1.0, 2.0, 2.0], [2.0, 2.0, 3.0, 3.0])
+    assert 0.0 < p_value < 0.1
+
+
+def test_normalize_filename():
+    assert normalize_filename("/out/run1/rank_0012.dat", r"\d+") == "/out/run1/rank_*.dat"
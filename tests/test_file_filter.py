@@ -0,0 +1,64 @@
+import pytest
+from recorder_pm.build_intervals import FileFilter, load_file_filter
+
+
+def write_rules(tmp_path, text):
+    path = tmp_path / "rules"
+    path.write_text(text)
+    return str(path)
+
+
+def test_default_rules():
+    file_filter = FileFilter()
+    assert file_filter.ignore("/proc/self/maps")
+    assert file_filter.ignore("stdout")
+    assert file_filter.ignore("/scratch/out.locktest")
+    assert file_filter.ignore("")
+    assert not file_filter.ignore("/scratch/out.dat")
+
+
+def test_rules_file(tmp_path):
+    path = write_rules(tmp_path, "# temporary files\nprefix /scratch/tmp/\n\ncontains .lock\nregex \\.o[0-9]+$\n")
+    file_filter = load_file_filter(path)
+    assert file_filter.ignore("/scratch/tmp/a")
+    assert file_filter.ignore("/scratch/out.lock")
+    assert file_filter.ignore("/home/job.o1234")
+    assert file_filter.ignore("/proc/self")
+    assert not file_filter.ignore("/scratch/out.dat")
+
+
+def test_tabs_and_hashes(tmp_path):
+    path = write_rules(tmp_path, "  # comment\nprefix\t/scratch/#tmp/\ncontains  run#1\n")
+    file_filter = load_file_filter(path, defaults=False)
+    assert file_filter.ignore("/scratch/#tmp/a")
+    assert file_filter.ignore("/home/run#1/out")
+    assert not file_filter.ignore("/scratch/tmp/a")
+
+
+def test_without_defaults(tmp_path):
+    path = write_rules(tmp_path, "prefix /scratch/tmp/\n")
+    file_filter = load_file_filter(path, defaults=False)
+    assert not file_filter.ignore("/proc/self")
+    assert file_filter.ignore("/scratch/tmp/a")
+
+
+def test_extra_rules():
+    file_filter = load_file_filter(None, ["/scratch/tmp/"], ["checkpoint"], defaults=False)
+    assert file_filter.ignore("/scratch/tmp/a")
+    assert file_filter.ignore("/home/checkpoint.1")
+    assert not file_filter.ignore("/home/out.1")
+
+
+def test_regex_rules_are_compiled_separately(tmp_path):
+    path = write_rules(tmp_path, "regex (?i)\\.tmp$\nregex ^/(a)/\\1/\n")
+    file_filter = load_file_filter(path, defaults=False)
+    assert file_filter.ignore("/scratch/out.TMP")
+    assert file_filter.ignore("/a/a/out")
+    assert not file_filter.ignore("/a/b/out")
+
+
+@pytest.mark.parametrize("line", ["suffix .tmp", "prefix", "prefix   ", "regex ([a-z]"])
+def test_invalid_rules(tmp_path, line):
+    path = write_rules(tmp_path, "# rules\n" + line + "\n")
+    with pytest.raises(ValueError, match=":2: invalid"):
+        load_file_filter(path)
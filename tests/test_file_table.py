@@ -0,0 +1,50 @@
+from recorder_pm.file_table import FileTable
+
+
+def test_filenames_are_interned():
+    files = FileTable()
+    a = files.get_id("/data/a")
+    b = files.get_id("/data/b")
+    assert a != b
+    assert files.get_id("/data/a") == a
+    assert files.name(b) == "/data/b"
+
+
+def test_handle_only_resolves_while_open():
+    files = FileTable()
+    assert files.resolve(0, "fh") is None
+    file_id = files.open_handle(0, "fh", "/data/a")
+    assert files.resolve(0, "fh") == file_id
+    assert files.close_handle(0, "fh") == file_id
+    assert files.resolve(0, "fh") is None
+    assert files.close_handle(0, "fh") is None
+
+
+def test_handles_are_per_rank():
+    files = FileTable()
+    a = files.open_handle(0, "fh", "/data/a")
+    b = files.open_handle(1, "fh", "/data/b")
+    assert files.resolve(0, "fh") == a
+    assert files.resolve(1, "fh") == b
+    files.close_handle(0, "fh")
+    assert files.resolve(1, "fh") == b
+
+
+def test_reused_handle_resolves_to_the_new_file():
+    files = FileTable()
+    files.open_handle(0, "fh", "/data/a")
+    files.close_handle(0, "fh")
+    b = files.open_handle(0, "fh", "/data/b")
+    assert files.resolve(0, "fh") == b
+
+
+def test_open_sessions_are_counted_per_rank_and_file():
+    files = FileTable()
+    files.open_handle(0, "fh", "/data/a")
+    files.open_handle(1, "fh", "/data/a")
+    assert files.session(0, "fh") == 0
+    assert files.session(1, "fh") == 0
+    files.close_handle(0, "fh")
+    files.open_handle(0, "fh2", "/data/a")
+    assert files.session(0, "fh2") == 1
+    assert files.session(1, "fh") == 0
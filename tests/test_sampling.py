@@ -0,0 +1,28 @@
+from recorder_pm.sampling import sample_ranks, t_quantile
+
+
+def test_t_quantile_rounds_down():
+    assert t_quantile(10) == 2.228
+    assert t_quantile(11) == 2.228
+    assert t_quantile(30) == 2.042
+    assert t_quantile(100) == 2.042
+
+
+def test_groups_are_disjoint_and_stratified():
+    group_ranks = sample_ranks(100, 0.2, 4, seed=1)
+    assert len(group_ranks) == 4
+    ranks = [rank for group in group_ranks for rank in group]
+    assert len(ranks) == len(set(ranks)) == 20
+    # every group has one rank of each block of consecutive ranks
+    for group in group_ranks:
+        assert sorted(rank * 5 // 100 for rank in group) == list(range(5))
+
+
+def test_sample_is_reproducible():
+    assert sample_ranks(64, 0.25, 4, seed=3) == sample_ranks(64, 0.25, 4, seed=3)
+
+
+def test_small_runs():
+    group_ranks = sample_ranks(3, 0.05, 5)
+    assert len(group_ranks) == 3
+    assert sorted(rank for group in group_ranks for rank in group) == [0, 1, 2]
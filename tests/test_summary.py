@@ -0,0 +1,61 @@
+import pytest
+from recorder_pm.build_intervals import LEVELS
+from recorder_pm.file_table import FileTable
+from recorder_pm.reporter import compute_metrics
+from recorder_pm.summary import get_prefix, FileSummary
+
+
+@pytest.mark.parametrize("filename, depth, prefix", [
+    ("/p/lustre/user/run/out.0", 2, "/p/lustre"),
+    ("/p/lustre/user/run/out.0", 3, "/p/lustre/user"),
+    ("/p/out.0", 2, "/p"),
+    ("/out.0", 2, "/"),
+    ("run/sub/dir/out.0", 2, "run/sub"),
+    ("run/out.0", 3, "run"),
+    ("out.0", 2, "."),
+])
+def test_get_prefix(filename, depth, prefix):
+    assert get_prefix(filename, depth) == prefix
+
+
+def file_metrics(write_bytes, e2e_time):
+    metrics = {}
+    for op_key in ("write", "read"):
+        metrics[op_key] = {level + "_meta_time": 0.0 for level in LEVELS}
+        metrics[op_key]["bytes"] = 0
+    metrics["write"]["bytes"] = write_bytes
+    metrics["write"]["posix_meta_time"] = e2e_time
+    return metrics
+
+
+def test_top_k_and_rollup():
+    summary = FileSummary(k=2, prefix_depth=1)
+    summary.add("/a/1", file_metrics(100, 1.0))
+    summary.add("/a/2", file_metrics(300, 3.0))
+    summary.add("/b/3", file_metrics(200, 4.0))
+    assert summary.num_files == 3
+    assert summary.get_top("write", "e2e_time") == [(4.0, "/b/3"), (3.0, "/a/2")]
+    assert summary.get_top("write", "bytes") == [(300, "/a/2"), (200, "/b/3")]
+    assert [x[1] for x in summary.get_top("write", "low_bw")] == ["/b/3", "/a/2"]
+    assert summary.get_top("read", "bytes") == []
+    assert summary.directories["/a"]["files"] == 2
+    assert summary.directories["/a"]["write"]["bytes"] == 400
+    assert summary.directories["/a"]["write"]["max_e2e_time"] == 3.0
+
+
+def test_compute_metrics_fills_the_summary():
+    files = FileTable()
+    data, meta_only = files.get_id("/a/data"), files.get_id("/a/meta")
+    intervals = {level: {} for level in LEVELS}
+    intervals["posix"][data] = [[0, 1.0, 1.1, "open", 0, "open", 0], [0, 2.0, 3.0, "write", 1024, "write", 0],
+                                [0, 4.0, 4.1, "close", 0, "close", 0]]
+    intervals["posix"][meta_only] = [[0, 1.0, 1.0, "open", 0, "open", 0]]
+    intervals["mpiio"][data] = [[0, 1.5, 3.5, "write", 1024, "MPI_File_write", 0]]
+
+    summary = FileSummary(k=5, prefix_depth=1)
+    metrics, reported = compute_metrics(None, intervals, 1, files, summary)
+    assert reported == ["/a/data"]
+    assert summary.num_files == 1
+    assert summary.get_top("write", "bytes") == [(1024, "/a/data")]
+    # the summary gets the final metrics of all levels
+    assert summary.get_top("write", "e2e_time")[0][0] == metrics.metrics["/a/data"]["write"]["mpiio_meta_time"]